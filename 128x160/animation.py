@@ -1,68 +1,10 @@
-import lcd_bus
+import lcd
 from micropython import const
 import machine
 from time import sleep
-import st7735
 import lvgl as lv
 
-lv.init()
-
-# display settings
-_WIDTH = 128
-_HEIGHT = 160
-_BL = 21
-_RST = 18
-_DC = 19
-
-_MOSI = 15  # SDA
-# _MISO = 20
-_SCK = 14  # SCL
-_HOST = 1  # SPI2
-
-_LCD_CS = 20
-_LCD_FREQ = 4000000
-
-_OFFSET_X = 0
-_OFFSET_Y = 0
-
-print('s1');
-spi_bus = machine.SPI.Bus(
-    host=_HOST,
-    mosi=_MOSI,
-    #miso=_MISO,
-    sck=_SCK
-)
-
-print('s2');
-display_bus = lcd_bus.SPIBus(
-    spi_bus=spi_bus,
-    freq=_LCD_FREQ,
-    dc=_DC,
-    cs=_LCD_CS,
-)
-
-print('s3');
-display = st7735.ST7735(
-    data_bus=display_bus,
-    display_width=_WIDTH,
-    display_height=_HEIGHT,
-    backlight_pin=_BL,
-    reset_pin=_RST,
-    reset_state=st7735.STATE_LOW,
-    backlight_on_state=st7735.STATE_HIGH,
-    color_space=lv.COLOR_FORMAT.RGB565,
-    color_byte_order=st7735.BYTE_ORDER_RGB,
-    rgb565_byte_swap=True,
-    offset_x=_OFFSET_X,
-    offset_y=_OFFSET_Y
-)
-
-print('s4');
-
-# Initialize display
-display.init(st7735.TYPE_R_GREEN)
-display.set_rotation(lv.DISPLAY_ROTATION._180)
-display.set_backlight(100)
+display = lcd.create('c6_zero_128x160')
 
 # Create screen
 scrn = lv.screen_active()
@@ -84,26 +26,24 @@ anim_speed = 2
 
 print('end')
 
-import utime as time
-time_passed = 1000
+import runloop
+
+
+def update():
+    global anim_x, anim_direction
 
-while True:
-    start_time = time.ticks_ms()
-    
     # Manual animation logic
     anim_x += anim_speed * anim_direction
-    
+
     # Check boundaries and reverse direction - stay within screen
     if anim_x > 80:  # Right boundary (screen width - text width)
         anim_direction = -1  # Reverse direction
     elif anim_x < 0:  # Left boundary
         anim_direction = 1  # Reverse direction
-    
+
     # Update label position
     animated_label.set_x(int(anim_x))
-    
-    time.sleep_ms(20)  # Animation frame delay
-    lv.tick_inc(time_passed)
-    lv.task_handler()
-    end_time = time.ticks_ms()
-    time_passed = time.ticks_diff(end_time, start_time)
\ No newline at end of file
+
+
+loop = runloop.RunLoop()
+loop.run(update, period_ms=20)  # Animation frame period
@@ -1,64 +1,10 @@
-import lcd_bus
+import lcd
 from micropython import const
 import machine
 from time import sleep
-import st7735
 import lvgl as lv
 
-# display settings
-_WIDTH = 128
-_HEIGHT = 160
-_BL = 21
-_RST = 18
-_DC = 19
-
-_MOSI = 15  # SDA
-# _MISO = 20
-_SCK = 14  # SCL
-_HOST = 1  # SPI2
-_LCD_CS = 20
-_LCD_FREQ = 4000000
-_OFFSET_X = 0
-_OFFSET_Y = 0
-
-print('s1');
-spi_bus = machine.SPI.Bus(
-    host=_HOST,
-    mosi=_MOSI,
-    #miso=_MISO,
-    sck=_SCK
-)
-
-print('s2');
-display_bus = lcd_bus.SPIBus(
-    spi_bus=spi_bus,
-    freq=_LCD_FREQ,
-    dc=_DC,
-    cs=_LCD_CS,
-)
-
-print('s3');
-display = st7735.ST7735(
-    data_bus=display_bus,
-    display_width=_WIDTH,
-    display_height=_HEIGHT,
-    backlight_pin=_BL,
-    reset_pin=_RST,
-    reset_state=st7735.STATE_LOW,
-    backlight_on_state=st7735.STATE_HIGH,
-    color_space=lv.COLOR_FORMAT.RGB565,
-    color_byte_order=st7735.BYTE_ORDER_RGB,
-    rgb565_byte_swap=True,
-    offset_x=_OFFSET_X,
-    offset_y=_OFFSET_Y
-)
-
-print('s4');
-
-# Initialize display
-display.init(st7735.TYPE_R_GREEN)
-display.set_rotation(lv.DISPLAY_ROTATION._180)
-display.set_backlight(100)
+display = lcd.create('c6_zero_128x160')
 
 # Create screen
 scrn = lv.screen_active()
@@ -69,7 +15,7 @@ fs_drv = lv.fs_drv_t()
 fs_register(fs_drv, "S")
 
 img = lv.image(scrn)
-img.set_src("S:colorful.png")
+img.set_src("S:colorful.bin")
 img.set_size(128, 160)
 img.center()
 
@@ -77,9 +23,7 @@ img.center()
 # task_handler.TaskHandler()
 # sleep(2)
 print('s5');
-import utime as time
-
-while True:
-    time.sleep_ms(20)
-    lv.task_handler()
+import runloop
 
+loop = runloop.RunLoop()
+loop.run()
@@ -1,69 +1,10 @@
-import lcd_bus
+import lcd
 from micropython import const
 import machine
 from time import sleep
-import st7735
 import lvgl as lv
 
-lv.init()
-
-# display settings
-_WIDTH = 80
-_HEIGHT = 160
-_BL = 19
-_RST = 14
-_DC = 15
-
-_MOSI = 21 #SDA
-_MISO = 20
-_SCK = 22  # SCL
-_HOST = 1  # SPI2
-
-_LCD_CS = 18
-_LCD_FREQ = 2000000
-
-_OFFSET_X = 26
-_OFFSET_Y = 1
-
-print('s1');
-spi_bus = machine.SPI.Bus(
-    host=_HOST,
-    mosi=_MOSI,
-    #miso=_MISO,
-    sck=_SCK
-)
-
-print('s2');
-display_bus = lcd_bus.SPIBus(
-    spi_bus=spi_bus,
-    freq=_LCD_FREQ,
-    dc=_DC,
-    cs=_LCD_CS,
-)
-
-print('s3');
-display = st7735.ST7735(
-    data_bus=display_bus,
-    display_width=_WIDTH,
-    display_height=_HEIGHT,
-    backlight_pin=_BL,
-    reset_pin=_RST,
-    reset_state=st7735.STATE_LOW,
-    backlight_on_state=st7735.STATE_HIGH,
-    color_space=lv.COLOR_FORMAT.RGB565,
-    color_byte_order=st7735.BYTE_ORDER_BGR,
-    rgb565_byte_swap=True,
-    offset_x=_OFFSET_X,
-    offset_y=_OFFSET_Y
-)
-
-print('s4');
-
-# display.set_power(True)
-display.init(st7735.TYPE_R_RED)
-display.set_color_inversion(True)
-# display.set_rotation(lv.DISPLAY_ROTATION._90)
-display.set_backlight(100)
+display = lcd.create('c6_80x160')
 
 scrn = lv.screen_active()
 scrn.set_style_bg_color(lv.color_hex(0xff0000), 0)
@@ -117,14 +58,7 @@ circle.align(lv.ALIGN.CENTER, 0, -10)
 
 print('end')
 
-import utime as time
-time_passed = 1000
-
-while True:
-    start_time = time.ticks_ms()
-    time.sleep_ms(1)  # sleep for 1 ms
-    lv.tick_inc(time_passed)
-    lv.task_handler()
-    end_time = time.ticks_ms()
-    time_passed = time.ticks_diff(end_time, start_time)
+import runloop
 
+loop = runloop.RunLoop()
+loop.run()
@@ -7,6 +7,16 @@ from machine import I2C, Pin
 from time import sleep_ms, ticks_ms, ticks_diff
 import math
 
+try:
+    # viper compiled when fastpath.py (repo root) is on the board
+    from fastpath import s16
+except ImportError:
+    def s16(msb, lsb):
+        value = (msb << 8) | lsb
+        if value >= 0x8000:
+            value -= 0x10000
+        return value
+
 class MPU9250:
     """MPU9250 9-axis IMU driver"""
     
@@ -166,12 +176,8 @@ class MPU9250:
         except:
             return (0, 0, 0)
     
-    def _combine_bytes(self, msb, lsb):
-        """Combine two bytes into signed 16-bit integer"""
-        value = (msb << 8) | lsb
-        if value >= 0x8000:
-            value = -((65535 - value) + 1)
-        return value
+    # Combine two bytes into signed 16-bit integer
+    _combine_bytes = staticmethod(s16)
 
 
 def main():
@@ -0,0 +1,21 @@
+import lcd
+import lvgl as lv
+import stripimage
+
+display = lcd.create('c6_128x128')
+
+# Create screen
+scrn = lv.screen_active()
+scrn.set_style_bg_color(lv.color_hex(0x000000), 0)  # Black background
+lv.task_handler()
+
+# q.png is 2083x2083, far too big to decode on the board. Convert it once:
+#   python3 tools/img2lvgl.py basic/q.png --size 128x128 --raw
+# and stream it 8 lines (2 KB) at a time instead of a 32 KB bitmap
+strips = stripimage.StripRenderer(display, lines=8)
+strips.draw(stripimage.RawSource('q_128x128.raw', 128, 128))
+
+# small PNGs can be streamed without converting
+strips.draw(stripimage.PNGSource('colorful.png'), x=54, y=54)
+
+print('end')
@@ -0,0 +1,53 @@
+import lcd
+import math
+import lvgl as lv
+import vscroll
+
+display = lcd.create('c6_128x128')
+
+# Create screen with a title bar, the band below it belongs to vscroll
+scrn = lv.screen_active()
+scrn.set_style_bg_color(lv.color_hex(0x000000), 0)  # Black background
+scrn.set_scrollbar_mode(lv.SCROLLBAR_MODE.OFF)  # Disable scrollbars
+
+title = lv.label(scrn)
+title.set_text('SemiBlock')
+title.set_style_text_color(lv.color_hex(0x00ff00), 0)  # Green text
+title.set_pos(0, 0)
+lv.task_handler()
+
+# rows 16..127 scroll in hardware, every step sends one 128 pixel line
+scroll = vscroll.VScroll(display, top=16, height=112)
+
+WIDTH = 128
+GREEN = b'\xe0\x07'  # native little endian RGB565, the bus swaps
+GRID = b'\x04\x21'
+row = bytearray(WIDTH * 2)
+t = 0
+last_x = WIDTH // 2
+
+print('end')
+
+import runloop
+
+
+def update():
+    global t, last_x
+
+    # one line of the chart: background, grid, and the trace joined to the last sample
+    for i in range(WIDTH * 2):
+        row[i] = 0
+    if t % 16 == 0:
+        for x in range(0, WIDTH, 2):
+            row[x * 2:x * 2 + 2] = GRID
+    x = int(WIDTH // 2 + 50 * math.sin(t * 0.05) * math.cos(t * 0.013))
+    for i in range(min(x, last_x), max(x, last_x) + 1):
+        row[i * 2:i * 2 + 2] = GREEN
+    last_x = x
+    t += 1
+
+    scroll.push(row)
+
+
+loop = runloop.RunLoop()
+loop.run(update, period_ms=20)  # one line every frame period
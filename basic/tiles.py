@@ -0,0 +1,56 @@
+import lcd
+import lvgl as lv
+import tilemap
+
+display = lcd.create('c6_128x128')
+
+# Create screen
+scrn = lv.screen_active()
+scrn.set_style_bg_color(lv.color_hex(0x000000), 0)  # Black background
+scrn.set_style_pad_all(0, 0)
+scrn.remove_flag(lv.obj.FLAG.SCROLLABLE)
+
+# 8x8 tiles: floor, wall with a darker edge
+atlas = tilemap.Atlas(8, 8)
+FLOOR = atlas.add_solid(0x9BBC0F)
+wall = bytearray()
+for y in range(8):
+    for x in range(8):
+        wall += tilemap.rgb565(0x0F380F if x == 7 or y == 7 else 0x306230)
+WALL = atlas.add(wall)
+
+tiles = tilemap.TileMap(scrn, 16, 16, atlas)
+tiles.fill(FLOOR)
+for i in range(16):
+    tiles.set(i, 0, WALL)
+    tiles.set(i, 15, WALL)
+    tiles.set(0, i, WALL)
+    tiles.set(15, i, WALL)
+
+# 12x12 ball sprite
+ball = tiles.sprite(tilemap.rgb565(0xff4000) * (12 * 12), 12, 12)
+x, y = 20, 30
+dx, dy = 2, 1
+ball.move(x, y)
+tiles.flush()
+
+print('end')
+
+import runloop
+
+
+def update():
+    global x, y, dx, dy
+
+    x += dx
+    y += dy
+    if x < 8 or x > 128 - 8 - 12:
+        dx = -dx
+    if y < 8 or y > 128 - 8 - 12:
+        dy = -dy
+    ball.move(x, y)
+    tiles.flush()  # one invalidate for the old and new ball position
+
+
+loop = runloop.RunLoop()
+loop.run(update, period_ms=20)
@@ -0,0 +1,192 @@
+"""display_bench, display throughput across SPI clocks and draw buffers
+
+Runs the standard workloads for every combination of SPI clock,
+draw-buffer lines and single/double buffering, and prints one JSON
+document with FPS, ms per frame and bytes per frame for each.
+
+    full_fill   - whole screen background colour change
+    label_move  - the moving 'SemiBlock' label from basic/animation.py
+    image_blit  - a 64x64 RGB565 image redrawn, as in basic/image.py
+    snake_step  - two 8x8 cells changed on the 128x112 snake canvas,
+                  each cell invalidated on its own like snake/snake.py
+    snake_full  - the same step with the whole canvas invalidated (the
+                  game before per-cell invalidation), for comparison
+
+On the board:   mpremote run bench/display_bench.py
+On the host:    micropython sim/run.py bench/display_bench.py --frames 0
+
+Bytes per frame are the pixel bytes pushed over SPI (from perf.py).
+"""
+
+import json
+import lcd
+import lvgl as lv
+import perf
+import utime as time
+
+PROFILE = 'c6_128x128'
+FREQS = [2000000, 4000000, 8000000, 20000000]
+BUF_LINES = [8, 16, 32, 64]
+DOUBLE_BUFFER = [False, True]
+FRAMES = 50
+
+
+def _image_dsc(w, h):
+    data = bytearray(w * h * 2)
+    for y in range(h):
+        for x in range(w):
+            c = ((x * 31 // w) << 11) | ((y * 63 // h) << 5) | 0x0F
+            o = (y * w + x) * 2
+            data[o] = c & 0xFF
+            data[o + 1] = c >> 8
+    dsc = lv.image_dsc_t({
+        'header': {'magic': 0x19, 'cf': lv.COLOR_FORMAT.RGB565, 'w': w, 'h': h, 'stride': w * 2},
+        'data_size': len(data),
+        'data': data,
+    })
+    return dsc, data
+
+
+def full_fill(scrn):
+    colors = [lv.color_hex(0xff0000), lv.color_hex(0x0000ff)]
+    state = [0]
+
+    def frame():
+        state[0] ^= 1
+        scrn.set_style_bg_color(colors[state[0]], 0)
+    return frame
+
+
+def label_move(scrn):
+    label = lv.label(scrn)
+    label.set_text('SemiBlock')
+    label.set_style_text_color(lv.color_hex(0x00ff00), 0)
+    label.set_pos(0, 60)
+    state = [0, 1]
+
+    def frame():
+        state[0] += 2 * state[1]
+        if state[0] > 80:
+            state[1] = -1
+        elif state[0] < 0:
+            state[1] = 1
+        label.set_x(state[0])
+    return frame
+
+
+def image_blit(scrn):
+    dsc, data = _image_dsc(64, 64)
+    img = lv.image(scrn)
+    img.set_src(dsc)
+    img.center()
+
+    def frame():
+        # the descriptor does not own the pixels, keep them referenced
+        img.invalidate()
+        return data
+    return frame
+
+
+def snake_step(scrn, whole=False):
+    cell = 8
+    w = 16 * cell
+    h = 14 * cell
+    cbuf = bytearray(w * h * 2)
+    canvas = lv.canvas(scrn)
+    canvas.set_buffer(cbuf, w, h, lv.COLOR_FORMAT.RGB565)
+    canvas.set_pos(0, 16)
+    state = [0]
+
+    def fill(col, row, value):
+        for y in range(row * cell, row * cell + cell):
+            o = (y * w + col * cell) * 2
+            cbuf[o:o + cell * 2] = value
+
+    head = b'\x86\x31' * cell
+    bg = b'\xe1\x9d' * cell
+    dirty = lv.area_t()
+
+    def invalidate_cell(col, row):
+        # invalidate_area takes screen coordinates, the canvas is at y 16
+        dirty.x1 = col * cell
+        dirty.y1 = 16 + row * cell
+        dirty.x2 = dirty.x1 + cell - 1
+        dirty.y2 = dirty.y1 + cell - 1
+        canvas.invalidate_area(dirty)
+
+    def frame():
+        # new head in, old tail out, like one snake step
+        i = state[0]
+        fill((i + 3) % 16, 7, head)
+        fill(i % 16, 7, bg)
+        state[0] = i + 1
+        if whole:
+            canvas.invalidate()
+        else:
+            invalidate_cell((i + 3) % 16, 7)
+            invalidate_cell(i % 16, 7)
+    return frame
+
+
+def snake_full(scrn):
+    return snake_step(scrn, whole=True)
+
+
+WORKLOADS = [
+    ('full_fill', full_fill),
+    ('label_move', label_move),
+    ('image_blit', image_blit),
+    ('snake_step', snake_step),
+    ('snake_full', snake_full),
+]
+
+
+def run_workload(display, setup, frames=FRAMES):
+    """run_workload, time `frames` forced refreshes of one workload"""
+
+    scrn = lv.obj()
+    scrn.set_style_bg_color(lv.color_hex(0x000000), 0)
+    scrn.remove_flag(lv.obj.FLAG.SCROLLABLE)
+    lv.screen_load(scrn)
+    frame = setup(scrn)
+    lv.refr_now(None)
+
+    prof = perf.FlushProfiler(display, frames=frames)
+    start = time.ticks_us()
+    for _ in range(frames):
+        frame()
+        lv.refr_now(None)
+    elapsed = time.ticks_diff(time.ticks_us(), start)
+    summary = prof.summary()
+    scrn.delete()
+
+    us = elapsed // frames
+    return {
+        'fps': 1000000 // us if us else 0,
+        'ms_per_frame': us / 1000,
+        'bytes_per_frame': summary.get('avg_bytes', 0),
+        'flush_us': summary.get('avg_flush_us', 0),
+    }
+
+
+def run(profile=PROFILE, freqs=FREQS, buf_lines=BUF_LINES, double_buffer=DOUBLE_BUFFER, frames=FRAMES):
+    """run, sweep every configuration and return the results list"""
+
+    results = []
+    for freq in freqs:
+        for lines in buf_lines:
+            for double in double_buffer:
+                display = lcd.create(profile, freq=freq, buf_lines=lines, double_buffer=double)
+                for name, setup in WORKLOADS:
+                    r = run_workload(display, setup, frames)
+                    r.update({
+                        'workload': name, 'freq': freq, 'buf_lines': lines,
+                        'double_buffer': double, 'buf_bytes': lcd.buffer_size(display.profile),
+                    })
+                    results.append(r)
+                lcd.release(display)
+    return results
+
+
+if __name__ == '__main__':
+    print(json.dumps({'profile': PROFILE, 'frames': FRAMES, 'results': run()}))
@@ -0,0 +1,49 @@
+"""viper_bench, speed of the fastpath.py viper helpers against plain Python
+
+    mpremote cp fastpath.py : + cp fastpath_viper.py : + run bench/viper_bench.py
+
+Each helper runs N times with the same arguments in both versions and
+the speedup is printed. On the host (python3 with sim/ on the path)
+only the Python versions exist and the speedup is 1.
+"""
+
+import utime as time
+import fastpath
+
+N = 2000
+
+
+def timed(fn, args, n=N):
+    t = time.ticks_us()
+    for _ in range(n):
+        fn(*args)
+    return time.ticks_diff(time.ticks_us(), t)
+
+
+def run():
+    # one 8x8 snake cell in the 128x112 canvas
+    cbuf = bytearray(128 * 112 * 2)
+    tile = b'\x86\x31' * 8
+    cases = [
+        ('blit_rows (8x8 cell)', fastpath.blit_rows_py, fastpath.blit_rows,
+         (cbuf, 7 * 8 * 256 + 5 * 16, 256, tile, 8)),
+        ('blit (16x16 tile)', fastpath.blit_py, fastpath.blit,
+         (cbuf, 2 * 16 * 256 + 3 * 32, 256, bytes(16 * 16 * 2), 0, 32, 32, 16)),
+        ('quad_step', fastpath.quad_step_py, fastpath.quad_step, (1, 3)),
+        ('s16', fastpath.s16_py, fastpath.s16, (0xFF, 0x38)),
+    ]
+
+    print('viper active:', fastpath.VIPER)
+    results = {}
+    for name, py, fast, args in cases:
+        assert py(*args) == fast(*args)
+        py_us = timed(py, args)
+        fast_us = timed(fast, args)
+        results[name] = (py_us, fast_us)
+        print('%-22s python %6d us  viper %6d us  x%.1f' % (
+            name, py_us, fast_us, py_us / fast_us if fast_us else 0))
+    return results
+
+
+if __name__ == '__main__':
+    run()
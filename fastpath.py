@@ -0,0 +1,93 @@
+"""fastpath, viper versions of small integer hot loops with Python fallbacks
+
+    blit_rows(buf, offset, stride, tile, rows)
+        copy `tile` into `rows` rows of buf, starting at byte offset and
+        stride bytes apart (snake cells)
+    blit(dst, doff, dstride, src, soff, sstride, row_bytes, rows)
+        copy a rectangle between two RGB565 buffers (tilemap.py)
+    quad_step(last, current)
+        quadrature decoder transition, 1, -1 or 0 (EC11 encoder)
+    s16(msb, lsb)
+        two bytes to a signed 16 bit integer (MPU9250 registers)
+
+The viper code lives in fastpath_viper.py and is picked at import time
+when it compiles and actually runs. Firmware without a native emitter
+for the target fails to import it, and on the host the sim/ micropython
+shim turns the decorators into no-ops so the bodies fail on ptr8/ptr16;
+either way the plain Python versions are used. VIPER tells which one is
+active, bench/viper_bench.py compares them.
+"""
+
+from array import array
+
+# quadrature transitions indexed by last << 2 | current, stored +1 so
+# they fit unsigned bytes: 00 -> 01 -> 11 -> 10 -> 00 is one direction
+_QUAD = bytes([1, 0, 2, 1, 2, 1, 1, 0, 0, 1, 1, 2, 1, 2, 0, 1])
+_QUAD_LIST = [v - 1 for v in _QUAD]
+
+
+def blit_rows_py(buf, offset, stride, tile, rows):
+    mv = memoryview(buf)
+    n = len(tile)
+    for _ in range(rows):
+        mv[offset:offset + n] = tile
+        offset += stride
+
+
+def blit_py(dst, doff, dstride, src, soff, sstride, row_bytes, rows):
+    d = memoryview(dst)
+    s = memoryview(src)
+    for _ in range(rows):
+        d[doff:doff + row_bytes] = s[soff:soff + row_bytes]
+        doff += dstride
+        soff += sstride
+
+
+def quad_step_py(last, current):
+    return _QUAD_LIST[((last << 2) | current) & 15]
+
+
+def s16_py(msb, lsb):
+    value = (msb << 8) | lsb
+    if value >= 0x8000:
+        value -= 0x10000
+    return value
+
+
+# the viper bodies are a separate module: if the firmware cannot compile
+# them the import fails and not this one
+try:
+    import fastpath_viper
+    VIPER = fastpath_viper.quad_step(0, 2) == 1
+except (SyntaxError, ImportError, NameError):
+    VIPER = False
+
+if VIPER:
+    # geometry arrays, older viper takes at most 4 arguments
+    _rows_geom = array('i', [0, 0, 0])
+    _blit_geom = array('i', [0, 0, 0, 0, 0, 0])
+
+    def blit_rows(buf, offset, stride, tile, rows):
+        g = _rows_geom
+        g[0] = offset
+        g[1] = stride
+        g[2] = rows
+        fastpath_viper.blit_rows(buf, tile, g)
+
+    def blit(dst, doff, dstride, src, soff, sstride, row_bytes, rows):
+        g = _blit_geom
+        g[0] = doff
+        g[1] = dstride
+        g[2] = soff
+        g[3] = sstride
+        g[4] = row_bytes
+        g[5] = rows
+        fastpath_viper.blit(dst, src, g)
+
+    quad_step = fastpath_viper.quad_step
+    s16 = fastpath_viper.s16
+else:
+    blit_rows = blit_rows_py
+    blit = blit_py
+    quad_step = quad_step_py
+    s16 = s16_py
@@ -0,0 +1,71 @@
+"""fastpath_viper, the viper bodies of fastpath.py
+
+Kept in their own module so fastpath can import them in a try: firmware
+without a native emitter for the target (or an older viper) fails while
+compiling this module, with SyntaxError/ImportError, and fastpath falls
+back to its Python versions. Older viper takes at most 4 arguments, so
+the blits get their geometry in an array('i') (see fastpath.py).
+"""
+
+import micropython
+
+# fastpath._QUAD: quadrature transitions indexed by last << 2 | current,
+# stored +1 so they fit unsigned bytes
+_QUAD = bytes([1, 0, 2, 1, 2, 1, 1, 0, 0, 1, 1, 2, 1, 2, 0, 1])
+
+
+@micropython.viper
+def blit_rows(buf, tile, geom):
+    # geom: offset, stride, rows (bytes, bytes, count)
+    g = ptr32(geom)
+    dst = ptr16(buf)
+    src = ptr16(tile)
+    n = int(len(tile)) >> 1
+    o = g[0] >> 1
+    s = g[1] >> 1
+    rows = g[2]
+    r = 0
+    while r < rows:
+        i = 0
+        while i < n:
+            dst[o + i] = src[i]
+            i += 1
+        o += s
+        r += 1
+
+
+@micropython.viper
+def blit(dst, src, geom):
+    # geom: doff, dstride, soff, sstride, row_bytes, rows
+    g = ptr32(geom)
+    d = ptr16(dst)
+    s = ptr16(src)
+    do = g[0] >> 1
+    ds = g[1] >> 1
+    so = g[2] >> 1
+    ss = g[3] >> 1
+    n = g[4] >> 1
+    rows = g[5]
+    r = 0
+    while r < rows:
+        i = 0
+        while i < n:
+            d[do + i] = s[so + i]
+            i += 1
+        do += ds
+        so += ss
+        r += 1
+
+
+@micropython.viper
+def quad_step(last: int, current: int) -> int:
+    table = ptr8(_QUAD)
+    return int(table[((last << 2) | current) & 15]) - 1
+
+
+@micropython.viper
+def s16(msb: int, lsb: int) -> int:
+    value = (msb << 8) | lsb
+    if value & 0x8000:
+        value -= 0x10000
+    return value
@@ -26,40 +26,76 @@ from math import pi, radians
 import machine
 import utime as time
 
-class AD9833:
+# words one batch() transfer holds: control, 2 x FREQ0, 2 x FREQ1,
+# PHASE0, PHASE1 and the selecting control word fit with room to spare
+BATCH_WORDS = 16
 
-    def __init__(self, sdo, clk, cs, fmclk=25):
-        """__init__, set up AD9833 object"""
 
-        self.fmclk = fmclk*10**6
+class AD9833:
 
-        # set up SPI connection details
-        # had to use phase = 1 even though the datasheet
-        # specifies phase = 0, on Pi SBC used phase = 0.
-        self.sdo = machine.Pin(sdo)
-        self.clk = machine.Pin(clk)
-        self.cs = machine.Pin(cs, machine.Pin.OUT)
-        self.cs.value(1)
-        
-        # Use software SPI to avoid conflicts with LCD hardware SPI
-        self.spi = machine.SoftSPI(
-            baudrate=1000000,  # Lower speed for reliability
-            polarity=1,
-            phase=1,
-            sck=machine.Pin(clk),
-            mosi=machine.Pin(sdo),
-            miso=machine.Pin(0)  # AD9833 doesn't need MISO
-        )
-        
-        # _HOST=1  # Use separate SPI host to avoid conflicts with LCD
-        # self.spi = machine.SPI.Bus(
-        #     host=_HOST,
-        #     sck=machine.Pin(clk),
-        #     mosi=machine.Pin(sdo),
-        #     # miso=machine.Pin(0)  # AD9833 doesn't need MISO
-        # )
-        # self.spi = machine.SPI(_HOST, baudrate = 4000000, polarity = 1, phase = 1, sck= self.clk, mosi = self.sdo)      
+    def __init__(self, sdo=None, clk=None, cs=None, fmclk=25, spi_bus=None, freq=10000000, lock=None):
+        """__init__, set up AD9833 object
 
+        With spi_bus (a machine.SPI.Bus, e.g. display.spi_bus) the chip is
+        a second device on that hardware bus with its own cs, in SPI mode
+        2 at freq, and sdo/clk are not needed. lock (lcd.bus_lock()) keeps
+        writes out of running display flushes. Without spi_bus it uses
+        SoftSPI on sdo/clk at 1 MHz."""
+
+        self.fmclk = fmclk*10**6
+        self.lock = lock
+
+        # preallocated transfer buffer, one frame per batch() block;
+        # frames[n - 1] is the view of the first n words
+        self._buf = bytearray(2 * BATCH_WORDS)
+        mv = memoryview(self._buf)
+        self._frames = [mv[:2 * n] for n in range(1, BATCH_WORDS + 1)]
+        self._n = 0
+        self._depth = 0
+        # second buffer for write_words(), a timer callback may run
+        # while a batch is being collected in the first
+        self._tbuf = bytearray(2 * BATCH_WORDS)
+        mv = memoryview(self._tbuf)
+        self._tframes = [mv[:2 * n] for n in range(1, BATCH_WORDS + 1)]
+
+        # shadow copies of the write-only registers, None until written;
+        # writes that would not change them are skipped, issued and
+        # elided count 16 bit words
+        self._freqR = [None, None]
+        self._phaseR = [None, None]
+        self.reset_shadow()
+        self.issued = 0
+        self.elided = 0
+
+        if spi_bus is not None:
+            # data is taken on the falling edge with SCLK idling high,
+            # CS is driven by the bus driver around each write
+            self.cs = None
+            self.spi = machine.SPI.Device(
+                spi_bus=spi_bus,
+                freq=freq,
+                cs=cs,
+                polarity=1,
+                phase=0
+            )
+        else:
+            # set up SPI connection details
+            # had to use phase = 1 even though the datasheet
+            # specifies phase = 0, on Pi SBC used phase = 0.
+            self.sdo = machine.Pin(sdo)
+            self.clk = machine.Pin(clk)
+            self.cs = machine.Pin(cs, machine.Pin.OUT)
+            self.cs.value(1)
+
+            # Software SPI on its own pins, no sharing with the LCD bus
+            self.spi = machine.SoftSPI(
+                baudrate=1000000,  # Lower speed for reliability
+                polarity=1,
+                phase=1,
+                sck=machine.Pin(clk),
+                mosi=machine.Pin(sdo),
+                miso=machine.Pin(0)  # AD9833 doesn't need MISO
+            )
 
         self.set_control_reg(B28=1, RESET=1)
 
@@ -73,17 +109,114 @@ class AD9833:
 
     def write_data(self, data):
         """write_data, function to write data to
-        the AD983x chip"""
+        the AD983x chip, data is a list of bytes (16 bit words MSB first)"""
 
         # print(data)
-        data = bytearray(data)  # creates buffer object
+        for i in range(0, len(data) - 1, 2):
+            self._word((data[i] << 8) | data[i + 1])
 
-        self.cs.value(0)
-        self.spi.write(data)
-        self.cs.value(1)
-        
         return
 
+    def reset_shadow(self):
+        """reset_shadow, forget the shadow registers so the next writes
+        all reach the chip (after it lost power or was written by other
+        code)"""
+
+        self._ctrl = None
+        self._freqR[0] = None
+        self._freqR[1] = None
+        self._phaseR[0] = None
+        self._phaseR[1] = None
+
+        return
+
+    def _word(self, word):
+        """_word, queue one 16 bit word, sent at once outside a batch"""
+
+        self.issued += 1
+        n = self._n
+        if n == BATCH_WORDS:
+            # buffer full, close this frame and start another
+            self._send()
+            n = 0
+        self._buf[2 * n] = word >> 8
+        self._buf[2 * n + 1] = word & 0xFF
+        self._n = n + 1
+        if not self._depth:
+            self._send()
+
+        return
+
+    def _send(self):
+        """_send, the queued words in one CS low frame, FSYNC may stay
+        low over any multiple of 16 clocks"""
+
+        n = self._n
+        if not n:
+            return
+        self._n = 0
+
+        if self.lock is not None and not self.lock.acquire():
+            # the words are dropped, the shadows no longer match the chip
+            self.reset_shadow()
+            raise OSError('SPI bus busy')
+        if self.cs is None:
+            self.spi.write(self._frames[n - 1])
+        else:
+            self.cs.value(0)
+            self.spi.write(self._frames[n - 1])
+            self.cs.value(1)
+
+        return
+
+    def write_words(self, words, start, n):
+        """write_words, send n precomputed register words from
+        words[start] (an array('H')) in one frame, without waiting or
+        allocating, for timer callbacks. Returns False and sends nothing
+        while a display flush holds the shared bus. The shadow registers
+        are dropped; don't call the other setters while a player runs."""
+
+        if self.lock is not None and not self.lock.try_acquire():
+            return False
+
+        buf = self._tbuf
+        for i in range(n):
+            w = words[start + i]
+            buf[2 * i] = w >> 8
+            buf[2 * i + 1] = w & 0xFF
+        if self.cs is None:
+            self.spi.write(self._tframes[n - 1])
+        else:
+            self.cs.value(0)
+            self.spi.write(self._tframes[n - 1])
+            self.cs.value(1)
+        self.issued += n
+        self.reset_shadow()
+
+        return True
+
+    def batch(self):
+        """batch, collect the writes of a with block and send them in
+        one transfer when it ends:
+
+            with ad9833.batch():
+                ad9833.set_frequency(1000, 0)
+                ad9833.set_phase(0, 0)
+                ad9833.set_mode('SIN')
+        """
+
+        return self
+
+    def __enter__(self):
+        self._depth += 1
+        return self
+
+    def __exit__(self, *args):
+        self._depth -= 1
+        if not self._depth:
+            self._send()
+        return False
+
     def set_control_reg(self, B28=1, HLB=0, FS=0, PS=0, RESET=0, SLP1=0, SLP12=0, OP=0, DIV2=0, MODE=0):
         """set_control_reg, function to set any/all of the bits
         of the AD9833 control register"""
@@ -99,22 +232,40 @@ class AD9833:
         self.DIV2 = DIV2
         self.MODE = MODE
 
-        controlReg = (B28 << 13) + (HLB << 12) + (FS << 11) + (PS << 10) + (RESET <<
-                                                                            8) + (SLP1 << 7) + (SLP12 << 6) + (OP << 5) + (DIV2 << 3) + (MODE << 1)
+        controlReg = self.control_word()
 
         # print(hex(controlReg))
 
-        controlRegList = [(controlReg & 0xFF00) >> 8, controlReg & 0x00FF]
-
-        self.write_data(controlRegList)
+        if controlReg == self._ctrl:
+            self.elided += 1
+            return
+        self._ctrl = controlReg
+        self._word(controlReg)
 
         return
 
+    def control_word(self, FS=None, PS=None):
+        """control_word, control register value of the current
+        settings, optionally with another FS/PS"""
+
+        if FS is None:
+            FS = self.FS
+        if PS is None:
+            PS = self.PS
+
+        return (self.B28 << 13) + (self.HLB << 12) + (FS << 11) + (PS << 10) + (self.RESET << 8) + \
+            (self.SLP1 << 7) + (self.SLP12 << 6) + (self.OP << 5) + (self.DIV2 << 3) + (self.MODE << 1)
+
+    def freq_reg(self, fout):
+        """freq_reg, 28 bit frequency register value for fout Hz"""
+
+        return int((fout*pow(2, 28))/self.fmclk) & 0xFFFFFFF
+
     def set_frequency(self, fout, freqSelect):
         """set_frequency, function to set the frequency registers"""
 
         # calculate frequncy register value from fout
-        freqR = int((fout*pow(2, 28))/self.fmclk)
+        freqR = self.freq_reg(fout)
 
         # split frequency register value into 2
         # 14 bit segments
@@ -129,24 +280,49 @@ class AD9833:
             addr = 0b10
             self.freq1 = fout
 
+        # skip the halves the register already holds
+        # (a half write leaves the other half unknown until written)
+        old = self._freqR[freqSelect]
+        if self.writeMode == 'BOTH':
+            new = freqR
+        elif old is None:
+            new = None
+        elif self.writeMode == 'MSB':
+            new = (old & 0x3FFF) | (freqR & 0xFFFC000)
+        else:
+            new = (old & 0xFFFC000) | fLSB
+        if new is not None and new == old:
+            self.elided += 2 if self.writeMode == 'BOTH' else 1
+            return
+        self._freqR[freqSelect] = new
+
         fMSB = fMSB + (addr << 14)
         fLSB = fLSB + (addr << 14)
 
         # print(hex(fLSB), hex(fMSB))
 
-        # split fMSB & fLSB into 8 bits segements
-        # for writing to AD9833 freq registers
-
-        fLSBList = [(fLSB & 0xFF00) >> 8, fLSB & 0x00FF]
-        fMSBList = [(fMSB & 0xFF00) >> 8, fMSB & 0x00FF]
-        fBoth = fLSBList + fMSBList
-
         if self.writeMode == 'MSB':
-            self.write_data(fMSBList)
+            self._word(fMSB)
         elif self.writeMode == 'LSB':
-            self.write_data(fLSBList)
+            self._word(fLSB)
         else:
-            self.write_data(fBoth)
+            # LSB then MSB in one frame
+            with self:
+                self._word(fLSB)
+                self._word(fMSB)
+
+        return
+
+    def hop(self, fout):
+        """hop, glitch free frequency change: load fout into the FREQ
+        register not in use, then switch FS to it, in one transfer. The
+        phase accumulator keeps running, so the output stays phase
+        continuous"""
+
+        FS = 1 - self.FS
+        with self:
+            self.set_frequency(fout, FS)
+            self.select_freq_phase(FS, self.PS)
 
         return
 
@@ -158,7 +334,12 @@ class AD9833:
             # convert degrees to radians
             pout = radians(pout)
 
-        phaseR = int(pout*4096/(2*pi))
+        phaseR = int(pout*4096/(2*pi)) & 0xFFF
+
+        if phaseR == self._phaseR[phaseSelect]:
+            self.elided += 1
+            return
+        self._phaseR[phaseSelect] = phaseR
 
         # add phase address
         # 12 bit regValue
@@ -166,11 +347,7 @@ class AD9833:
         # 3 bit address
         phaseR = phaseR + (0b11 << 14) + (phaseSelect << 13)
 
-        # split phaseR into 8 bits segements
-        # for writing to AD9833 phase registers
-        phaseRList = [(phaseR & 0xFF00) >> 8, phaseR & 0x00FF]
-
-        self.write_data(phaseRList)
+        self._word(phaseR)
 
         return
 
@@ -179,8 +356,6 @@ class AD9833:
         AD9833 as well as the active frequency and phase registers.
         Valid modes include: 'RESET', 'OFF', 'SIN','TRIANGLE',
         'SQUARE', 'SQUARE/2'"""
-        
-        print(mode)
 
         self.mode = mode
 
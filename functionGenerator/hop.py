@@ -0,0 +1,142 @@
+"""hop, phase continuous frequency hopping on the AD9833 from a timer
+
+Every step loads the next frequency into the FREQ register that is not
+in use and then flips FS to it, three 16 bit words in one SPI frame
+(FREQ LSB, FREQ MSB, control). The output switches on the control word
+with no half written register in between, and the phase accumulator
+keeps running, so the hops are glitch free and phase continuous.
+
+The register words are precomputed into an array('H'), the timer
+callback only copies one step into the driver's buffer and sends it:
+
+    import hop
+    words = hop.table(ad9833, [1000, 1200, 1000, 2200])
+    player = hop.Player(ad9833, words)
+    player.start(rate_hz=500)
+    ...
+    player.stop()
+
+While the player runs the driver must not be used from the main loop.
+With a shared display bus (lcd.bus_lock) a step that finds a flush in
+progress is skipped and retried on the next tick, counted in skipped.
+"""
+
+from array import array
+import machine
+
+# words per step: FREQ LSB, FREQ MSB, control
+STEP_WORDS = 3
+
+
+def table(dds, freqs, loop=True):
+    """table, register words to hop through freqs (Hz, any iterable, it
+    is read once), starting with the FREQ register dds is not using.
+    With loop the table has an even number of steps so it repeats
+    without writing the active register. Each step loads both 14 bit
+    halves, so dds must be in 'BOTH' write mode (B28 set)"""
+
+    if dds.writeMode != 'BOTH' or not dds.B28:
+        raise ValueError("hopping needs set_write_mode('BOTH')")
+
+    words = array('H')
+    FS = dds.FS
+    for fout in freqs:
+        FS = 1 - FS
+        freqR = dds.freq_reg(fout)
+        addr = 0b10 if FS else 0b01
+        words.append((freqR & 0x3FFF) | (addr << 14))
+        words.append(((freqR >> 14) & 0x3FFF) | (addr << 14))
+        words.append(dds.control_word(FS=FS))
+
+    n = len(words)
+    if loop and (n // STEP_WORDS) % 2:
+        # odd: the steps again on the other registers, FREQ0 <-> FREQ1
+        # address bits and the FS bit flipped
+        for i in range(0, n, STEP_WORDS):
+            words.append(words[i] ^ 0xC000)
+            words.append(words[i + 1] ^ 0xC000)
+            words.append(words[i + 2] ^ 0x0800)
+
+    return words
+
+
+class Player:
+
+    def __init__(self, dds, words, timer_id=0):
+        """__init__, play a table of STEP_WORDS word steps on dds"""
+
+        self.dds = dds
+        self.words = words
+        self.n = len(words)
+        self.timer = machine.Timer(timer_id)
+        self.pos = 0
+        self.repeat = True
+        self.running = False
+        self.steps = 0
+        self.skipped = 0
+        self.laps = 0
+        return
+
+    def ready(self):
+        """ready, True when the table fits the register dds is using now:
+        its first step must load the other one. A table is built for one
+        FS, after stop() on an odd step the output is on the other one"""
+
+        return self.n >= STEP_WORDS and (self.words[2] >> 11) & 1 != self.dds.FS
+
+    def start(self, rate_hz, repeat=True):
+        """start, one step per timer tick at rate_hz from the start of
+        the table; without repeat it stops after the last step. Raises
+        ValueError when the table would write the active register, build
+        a new one with table()"""
+
+        if not self.ready():
+            raise ValueError('table built for the other FREQ register')
+        self.pos = 0
+        self.repeat = repeat
+        self.running = True
+        self.timer.init(mode=machine.Timer.PERIODIC, freq=rate_hz, callback=self._tick)
+        return
+
+    def stop(self):
+        """stop, halt the timer and leave the output on the last step"""
+
+        self.timer.deinit()
+        self.running = False
+        if self.pos:
+            # tell the driver which register the output is on
+            self.dds.FS = (self.words[self.pos - 1] >> 11) & 1
+        return
+
+    def _tick(self, t):
+        # timer callback: no waiting, no allocation
+        if self.pos >= self.n:
+            if not self.repeat:
+                self.stop()
+                return
+            self.pos = 0
+            self.laps += 1
+        if self.dds.write_words(self.words, self.pos, STEP_WORDS):
+            self.pos += STEP_WORDS
+            self.steps += 1
+        else:
+            self.skipped += 1
+        return
+
+
+if __name__ == "__main__":
+
+    import AD9833
+    import utime as time
+
+    ad9833 = AD9833.AD9833(sdo=1, clk=2, cs=22, fmclk=25)
+    ad9833.set_frequency(1000, 0)
+    ad9833.select_freq_phase(0, 0)
+    ad9833.set_mode('SIN')
+
+    # two tone FSK pattern, 1 ms per symbol
+    player = Player(ad9833, table(ad9833, [1200, 2200, 2200, 1200, 2200, 1200]))
+    player.start(rate_hz=1000)
+    time.sleep(5)
+    player.stop()
+    print('steps', player.steps, 'skipped', player.skipped, 'laps', player.laps)
@@ -1,13 +1,13 @@
-import lcd_bus
+import lcd
 from micropython import const
 import machine
 from time import sleep
-import st7735
 import lvgl as lv
 import utime as time
 from fs_driver import fs_register
 from machine import Pin
 import AD9833
+import theme
 
 # AD9833 c6 zero
 AD9833_SDO = 1
@@ -19,21 +19,13 @@ AD9833_CS = 22
 # AD9833_CLK = 14
 # AD9833_CS = 22
 
-# display settings
-_WIDTH = 128
-_HEIGHT = 128
-_BL = 21
-_RST = 18
-_DC = 19
-
-_MOSI = 15  # SDA
-# _MISO = 20
-_SCK = 14  # SCL
-_HOST = 1  # SPI2
-_LCD_CS = 20
-_LCD_FREQ = 4000000
-_OFFSET_X = 2
-_OFFSET_Y = 3
+# AD9833 wired to the LCD MOSI/SCK (15/14) with its own CS: share the
+# display's hardware SPI bus, writes wait for a running flush (lcd.bus_lock)
+AD9833_SHARED_SPI = False
+
+
+# FPS/CPU overlay and per-frame flush counters (perf.py), printed on every change
+PROFILE = False
 
 # Buttons
 BUTTON0 = 4
@@ -42,6 +34,7 @@ ROTATE_BUTTON_S2 = 3
 
 selected = 0
 selectedFreqBtn = 0
+shown = None  # button index drawn as selected
 currentFreq = 4000
 currentPhase = 0  # Current phase in degrees
 
@@ -65,58 +58,32 @@ def format_frequency(freq):
 
 
 def drawMenu():
-    # Only update button backgrounds and frequency label
-    global menu_buttons, selected
-    for i, btn in enumerate(menu_buttons):
-        if i == selected:
-            btn.set_style_bg_color(lv.color_hex(0xffffff), 0)
-        else:
-            btn.set_style_bg_color(lv.color_hex(0x8888dd), 0)
-
-
-spi_bus = machine.SPI.Bus(
-    host=_HOST,
-    mosi=_MOSI,
-    # miso=_MISO,
-    sck=_SCK
-)
-display_bus = lcd_bus.SPIBus(
-    spi_bus=spi_bus,
-    freq=_LCD_FREQ,
-    dc=_DC,
-    cs=_LCD_CS,
-)
-
-display = st7735.ST7735(
-    data_bus=display_bus,
-    display_width=_WIDTH,
-    display_height=_HEIGHT,
-    backlight_pin=_BL,
-    reset_pin=_RST,
-    reset_state=st7735.STATE_LOW,
-    backlight_on_state=st7735.STATE_HIGH,
-    color_space=lv.COLOR_FORMAT.RGB565,
-    color_byte_order=st7735.BYTE_ORDER_BGR,
-    rgb565_byte_swap=True,
-    offset_x=_OFFSET_X,
-    offset_y=_OFFSET_Y
-)
-
-# Initialize display
-display.init(st7735.TYPE_R_RED)
-display.set_rotation(lv.DISPLAY_ROTATION._180)
-display.set_backlight(100)
+    # Only the previously and newly selected buttons change state
+    global shown
+    shown = theme.select(menu_buttons, shown, selected)
+
+
+display = lcd.create('c6_zero_128x128')
+bus_lock = lcd.bus_lock(display) if AD9833_SHARED_SPI else None
+
+task_handler = lv.task_handler
+refr_now = lv.refr_now
+if PROFILE:
+    import perf
+    prof = perf.FlushProfiler(display, overlay=True)
+    task_handler = prof.task_handler
+    refr_now = prof.refr_now
 
 # Create screen
 scrn = lv.screen_active()
-scrn.set_style_bg_color(lv.color_hex(0x000000), 0)
+theme.screen(scrn)
 scrn.set_scrollbar_mode(lv.SCROLLBAR_MODE.OFF)
 
 fs_drv = lv.fs_drv_t()
 fs_register(fs_drv, "S")
 
 img = lv.image(scrn)
-img.set_src("S:blue.png")
+img.set_src("S:blue.bin")
 img.set_size(20, 20)
 img.set_pos(0, 5)
 
@@ -124,8 +91,7 @@ img.set_pos(0, 5)
 label = lv.label(scrn)
 label.set_text("Func Generator")
 label.set_pos(24, 8)
-label.set_style_text_color(lv.color_hex(0xffffff), 0)
-label.set_style_text_font(lv.font_montserrat_12, 0)
+theme.text(label)
 
 button0 = Pin(BUTTON0, Pin.IN, Pin.PULL_UP)  # Button pin
 
@@ -148,8 +114,7 @@ btn.set_pos(0, 30)
 btn.set_size(75, 20)  # Reduced width for waveform button
 freqLbl = lv.label(btn)
 freqLbl.set_text(freq[0])
-freqLbl.set_style_text_color(lv.color_hex(0x000000), 0)
-freqLbl.set_style_text_font(lv.font_montserrat_12, 0)
+theme.button(btn, freqLbl)
 freqLbl.center()
 menu_buttons.append(btn)
 
@@ -159,8 +124,7 @@ phase_btn.set_pos(80, 30)  # Position next to waveform button
 phase_btn.set_size(45, 20)
 phase_btn_lbl = lv.label(phase_btn)
 phase_btn_lbl.set_text("PHASE")
-phase_btn_lbl.set_style_text_color(lv.color_hex(0x000000), 0)
-phase_btn_lbl.set_style_text_font(lv.font_montserrat_12, 0)
+theme.button(phase_btn, phase_btn_lbl)
 phase_btn_lbl.center()
 menu_buttons.append(phase_btn)  # Insert PHASE button as second button
 
@@ -173,8 +137,7 @@ for i, label in enumerate(["1Hz", "10Hz", "100Hz", "1kHz", "10kHz", "1MHz"]):
     btn.set_size(40, 20)
     lbl = lv.label(btn)
     lbl.set_text(label)
-    lbl.set_style_text_color(lv.color_hex(0x000000), 0)
-    lbl.set_style_text_font(lv.font_montserrat_12, 0)
+    theme.button(btn, lbl)
     lbl.center()
     menu_buttons.append(btn)
 
@@ -182,15 +145,13 @@ for i, label in enumerate(["1Hz", "10Hz", "100Hz", "1kHz", "10kHz", "1MHz"]):
 # --- Create frequency label once ---
 freq_label = lv.label(scrn)
 freq_label.set_pos(5, 100)
-freq_label.set_style_text_color(lv.color_hex(0xffffff), 0)
-freq_label.set_style_text_font(lv.font_montserrat_16, 0)
+theme.value(freq_label)
 freq_label.set_text(format_frequency(currentFreq))
 
 # --- Create phase label ---
 phase_label = lv.label(scrn)
 phase_label.set_pos(5, 115)
-phase_label.set_style_text_color(lv.color_hex(0xffffff), 0)
-phase_label.set_style_text_font(lv.font_montserrat_12, 0)
+theme.text(phase_label)
 phase_label.set_text(f"Phase: {currentPhase}°")
 
 drawMenu()
@@ -198,17 +159,21 @@ drawMenu()
 # temp.value(1)
 # display_bus.deinit()
 
-ad9833 = AD9833.AD9833(sdo=AD9833_SDO, clk=AD9833_CLK, cs=AD9833_CS,  fmclk=25)
-ad9833.set_frequency(currentFreq, 0)
-ad9833.set_phase(currentPhase, 0, rads=False)
-ad9833.set_phase((currentPhase + 180) % 360, 1, rads=False)
-ad9833.select_freq_phase(0, 0)
-ad9833.set_mode('SQUARE')
+if AD9833_SHARED_SPI:
+    ad9833 = AD9833.AD9833(cs=AD9833_CS, fmclk=25, spi_bus=display.spi_bus, lock=bus_lock)
+else:
+    ad9833 = AD9833.AD9833(sdo=AD9833_SDO, clk=AD9833_CLK, cs=AD9833_CS,  fmclk=25)
+with ad9833.batch():
+    ad9833.set_frequency(currentFreq, 0)
+    ad9833.set_phase(currentPhase, 0, rads=False)
+    ad9833.set_phase((currentPhase + 180) % 360, 1, rads=False)
+    ad9833.select_freq_phase(0, 0)
+    ad9833.set_mode('SQUARE')
 time.sleep(2)
 
 drawMenu()
-lv.refr_now(lv.screen_active().get_display())
-lv.task_handler()
+refr_now(lv.screen_active().get_display())
+task_handler()
 while True:
     # time.sleep_ms(20)
     # sleep(0.2)
@@ -219,8 +184,8 @@ while True:
         selected = (selected + 1) % len(menu_buttons)
         print(selected)
         drawMenu()
-        lv.refr_now(lv.screen_active().get_display())
-        lv.task_handler()
+        refr_now(lv.screen_active().get_display())
+        task_handler()
         b = True
         while not button0.value():
             pass  # Wait for release (debounce)
@@ -236,16 +201,16 @@ while True:
                 currentFreqLabelIndex = (currentFreqLabelIndex + 1) % len(freq)
                 print(f"Rotary CW: selected {selected}")
                 freqLbl.set_text(freq[currentFreqLabelIndex])
-                lv.refr_now(lv.screen_active().get_display())
-                lv.task_handler()
+                refr_now(lv.screen_active().get_display())
+                task_handler()
                 b = True
         elif selected == 0 and rotary_s2_prev == 1 and s2 == 0:  # S2 falling edge
             if s1 == 0:  # Counter-clockwise
                 currentFreqLabelIndex = (currentFreqLabelIndex - 1) % len(freq)
                 print(f"Rotary CCW: selected {selected}")
                 freqLbl.set_text(freq[currentFreqLabelIndex])
-                lv.refr_now(lv.screen_active().get_display())
-                lv.task_handler()
+                refr_now(lv.screen_active().get_display())
+                task_handler()
                 b = True
         elif selected > 1 and selected < 8 and rotary_s1_prev == 1 and s1 == 0:  # S1 falling edge
             if s2 == 0:  # Clockwise
@@ -265,8 +230,8 @@ while True:
                 if currentFreq > 12600000:
                     currentFreq = 12600000
                 freq_label.set_text(format_frequency(currentFreq))
-                lv.refr_now(lv.screen_active().get_display())
-                lv.task_handler()
+                refr_now(lv.screen_active().get_display())
+                task_handler()
                 b = True
         elif selected > 1 and selected < 8 and rotary_s2_prev == 1 and s2 == 0:  # S2 falling edge
             if s1 == 0:  # Counter-clockwise
@@ -285,22 +250,22 @@ while True:
                 if currentFreq < 0:
                     currentFreq = 0
                 freq_label.set_text(format_frequency(currentFreq))
-                lv.refr_now(lv.screen_active().get_display())
-                lv.task_handler()
+                refr_now(lv.screen_active().get_display())
+                task_handler()
                 b = True
         elif selected == 1 and rotary_s1_prev == 1 and s1 == 0:  # Phase adjustment - S1 falling edge
             if s2 == 0:  # Clockwise - increase phase
                 currentPhase = (currentPhase + 10) % 360
                 phase_label.set_text(f"Phase: {currentPhase}°")
-                lv.refr_now(lv.screen_active().get_display())
-                lv.task_handler()
+                refr_now(lv.screen_active().get_display())
+                task_handler()
                 b = True
         elif selected == 1 and rotary_s2_prev == 1 and s2 == 0:  # Phase adjustment - S2 falling edge
             if s1 == 0:  # Counter-clockwise - decrease phase
                 currentPhase = (currentPhase - 10) % 360
                 phase_label.set_text(f"Phase: {currentPhase}°")
-                lv.refr_now(lv.screen_active().get_display())
-                lv.task_handler()
+                refr_now(lv.screen_active().get_display())
+                task_handler()
                 b = True
 
         rotary_s1_prev = s1
@@ -309,17 +274,21 @@ while True:
 
     if b:
         print(currentFreqLabelIndex, currentFreq, currentPhase)
-        if currentFreqLabelIndex == 0:
-            ad9833.set_frequency(currentFreq, 0)
-            # ad9833.select_freq_phase(0, 0)
-            ad9833.set_mode('SQUARE')
-        elif currentFreqLabelIndex == 1:
-            ad9833.set_frequency(currentFreq, 0)
-            ad9833.set_phase((currentPhase + 180) % 360, 0, rads=False)
-            # ad9833.set_phase((currentPhase + 180) % 360, 1, rads=False)
-            ad9833.select_freq_phase(0, 0)
-            ad9833.set_mode('SIN')
-        elif currentFreqLabelIndex == 2:
-            ad9833.select_freq_phase(0, 0)
-            ad9833.set_frequency(currentFreq, 0)
-            ad9833.set_mode('TRIANGLE')
+        if PROFILE:
+            prof.report()
+            print('ad9833 words sent', ad9833.issued, 'elided', ad9833.elided)
+        with ad9833.batch():  # one SPI transfer
+            if currentFreqLabelIndex == 0:
+                ad9833.set_frequency(currentFreq, 0)
+                # ad9833.select_freq_phase(0, 0)
+                ad9833.set_mode('SQUARE')
+            elif currentFreqLabelIndex == 1:
+                ad9833.set_frequency(currentFreq, 0)
+                ad9833.set_phase((currentPhase + 180) % 360, 0, rads=False)
+                # ad9833.set_phase((currentPhase + 180) % 360, 1, rads=False)
+                ad9833.select_freq_phase(0, 0)
+                ad9833.set_mode('SIN')
+            elif currentFreqLabelIndex == 2:
+                ad9833.select_freq_phase(0, 0)
+                ad9833.set_frequency(currentFreq, 0)
+                ad9833.set_mode('TRIANGLE')
@@ -1,13 +1,14 @@
-import lcd_bus
+import lcd
 from micropython import const
 import machine
 from time import sleep
-import st7735
 import lvgl as lv
 import utime as time
 from fs_driver import fs_register
 from machine import Pin
 import AD9833
+import theme
+from EC11 import EC11
 
 # AD9833 c6 zero
 AD9833_SDO = 1
@@ -19,21 +20,10 @@ AD9833_CS = 22
 # AD9833_CLK = 14
 # AD9833_CS = 22
 
-# display settings
-_WIDTH = 128
-_HEIGHT = 128
-_BL = 21
-_RST = 18
-_DC = 19
-
-_MOSI = 15  # SDA
-# _MISO = 20
-_SCK = 14  # SCL
-_HOST = 1  # SPI2
-_LCD_CS = 20
-_LCD_FREQ = 4000000
-_OFFSET_X = 2
-_OFFSET_Y = 3
+# AD9833 wired to the LCD MOSI/SCK (15/14) with its own CS: share the
+# display's hardware SPI bus, writes wait for a running flush (lcd.bus_lock)
+AD9833_SHARED_SPI = False
+
 
 # Buttons
 BUTTON0 = 4
@@ -42,6 +32,7 @@ ROTATE_BUTTON_S2 = 3
 
 selected = 0
 selectedFreqBtn = 0
+shown = None  # button index drawn as selected
 currentFreq = 4000
 currentPhase = 0  # Current phase in degrees
 
@@ -65,58 +56,24 @@ def format_frequency(freq):
 
 
 def drawMenu():
-    # Only update button backgrounds and frequency label
-    global menu_buttons, selected
-    for i, btn in enumerate(menu_buttons):
-        if i == selected:
-            btn.set_style_bg_color(lv.color_hex(0xffffff), 0)
-        else:
-            btn.set_style_bg_color(lv.color_hex(0x8888dd), 0)
-
-
-spi_bus = machine.SPI.Bus(
-    host=_HOST,
-    mosi=_MOSI,
-    # miso=_MISO,
-    sck=_SCK
-)
-display_bus = lcd_bus.SPIBus(
-    spi_bus=spi_bus,
-    freq=_LCD_FREQ,
-    dc=_DC,
-    cs=_LCD_CS,
-)
-
-display = st7735.ST7735(
-    data_bus=display_bus,
-    display_width=_WIDTH,
-    display_height=_HEIGHT,
-    backlight_pin=_BL,
-    reset_pin=_RST,
-    reset_state=st7735.STATE_LOW,
-    backlight_on_state=st7735.STATE_HIGH,
-    color_space=lv.COLOR_FORMAT.RGB565,
-    color_byte_order=st7735.BYTE_ORDER_BGR,
-    rgb565_byte_swap=True,
-    offset_x=_OFFSET_X,
-    offset_y=_OFFSET_Y
-)
-
-# Initialize display
-display.init(st7735.TYPE_R_RED)
-display.set_rotation(lv.DISPLAY_ROTATION._180)
-display.set_backlight(100)
+    # Only the previously and newly selected buttons change state
+    global shown
+    shown = theme.select(menu_buttons, shown, selected)
+
+
+display = lcd.create('c6_zero_128x128')
+bus_lock = lcd.bus_lock(display) if AD9833_SHARED_SPI else None
 
 # Create screen
 scrn = lv.screen_active()
-scrn.set_style_bg_color(lv.color_hex(0x000000), 0)
+theme.screen(scrn)
 scrn.set_scrollbar_mode(lv.SCROLLBAR_MODE.OFF)
 
 fs_drv = lv.fs_drv_t()
 fs_register(fs_drv, "S")
 
 img = lv.image(scrn)
-img.set_src("S:blue.png")
+img.set_src("S:blue.bin")
 img.set_size(20, 20)
 img.set_pos(0, 5)
 
@@ -124,104 +81,10 @@ img.set_pos(0, 5)
 label = lv.label(scrn)
 label.set_text("Func Generator")
 label.set_pos(24, 8)
-label.set_style_text_color(lv.color_hex(0xffffff), 0)
-label.set_style_text_font(lv.font_montserrat_12, 0)
+theme.text(label)
 
 button0 = Pin(BUTTON0, Pin.IN, Pin.PULL_UP)  # Button pin
 
-# EC11 Rotary Encoder Class
-class EC11:
-    def __init__(self, pin_a, pin_b, pin_c):
-        """
-        Initialize EC11 rotary encoder for TaoBao version with external pull-ups
-        pin_a, pin_b: rotation pins (Terminal A and B)
-        pin_c: push button pin (Terminal C)
-        
-        IMPORTANT: This version has external 10K pull-ups to 5V
-        So we use Pin.IN (no internal pull-up)
-        """
-        # No internal pull-ups since external 10K pull-ups exist
-        self.pin_a = Pin(pin_a, Pin.IN)
-        self.pin_b = Pin(pin_b, Pin.IN)
-        # Use pull-down for button to make logic clearer: pressed=1, unpressed=0
-        self.pin_c = Pin(pin_c, Pin.IN, Pin.PULL_DOWN)
-        
-        # Quadrature state tracking
-        self.last_state = (self.pin_a.value() << 1) | self.pin_b.value()
-        
-        # Lookup table for quadrature decoding
-        # Based on state transitions: 00->01->11->10->00 (CW) or reverse (CCW)
-        self.state_table = [0, -1, 1, 0, 1, 0, 0, -1, -1, 0, 0, 1, 0, 1, -1, 0]
-        
-        # Counter for rotation
-        self.counter = 0
-        
-        # Accumulator for detent detection (4 steps = 1 detent)
-        self.step_accumulator = 0
-        
-        # Button state tracking
-        self.last_button = self.pin_c.value()
-        self.button_debounce_time = 0
-    
-    def read_rotation(self):
-        """
-        Read rotation direction using quadrature decoding
-        Returns: 1 for clockwise, -1 for counter-clockwise, 0 for no change
-        """
-        # Read current state
-        current_state = (self.pin_a.value() << 1) | self.pin_b.value()
-        
-        # Calculate index for lookup table
-        index = (self.last_state << 2) | current_state
-        
-        # Get direction from lookup table
-        direction = self.state_table[index]
-        
-        # Accumulate steps - only return value after 4 steps (1 detent)
-        if direction != 0:
-            self.step_accumulator += direction
-            self.counter += direction
-            
-            # Check if we've completed a detent (4 steps in one direction)
-            if abs(self.step_accumulator) >= 4:
-                result = 1 if self.step_accumulator > 0 else -1
-                self.step_accumulator = 0
-                self.last_state = current_state
-                return result
-        
-        # Update last state
-        self.last_state = current_state
-        
-        return 0
-    
-    def read_button(self):
-        """
-        Read button press with software debouncing
-        Returns: True if button was just pressed, False otherwise
-        """
-        current_time = time.ticks_ms()
-        current_button = self.pin_c.value()
-        
-        # Button is pressed when pin goes HIGH (from LOW to HIGH)
-        # With internal pull-down: unpressed=0, pressed=1
-        # Add debouncing: ignore changes within 50ms
-        if self.last_button == 0 and current_button == 1:
-            if time.ticks_diff(current_time, self.button_debounce_time) > 50:
-                self.button_debounce_time = current_time
-                self.last_button = current_button
-                return True
-        
-        self.last_button = current_button
-        return False
-    
-    def get_counter(self):
-        """Get current counter value"""
-        return self.counter
-    
-    def reset_counter(self):
-        """Reset counter to zero"""
-        self.counter = 0
-
 # Initialize EC11 encoder
 encoder = EC11(pin_a=ROTATE_BUTTON_S1, pin_b=ROTATE_BUTTON_S2, pin_c=BUTTON0)
 
@@ -236,8 +99,7 @@ btn.set_pos(0, 30)
 btn.set_size(75, 20)  # Reduced width for waveform button
 freqLbl = lv.label(btn)
 freqLbl.set_text(freq[0])
-freqLbl.set_style_text_color(lv.color_hex(0x000000), 0)
-freqLbl.set_style_text_font(lv.font_montserrat_12, 0)
+theme.button(btn, freqLbl)
 freqLbl.center()
 menu_buttons.append(btn)
 
@@ -247,8 +109,7 @@ phase_btn.set_pos(80, 30)  # Position next to waveform button
 phase_btn.set_size(45, 20)
 phase_btn_lbl = lv.label(phase_btn)
 phase_btn_lbl.set_text("PHASE")
-phase_btn_lbl.set_style_text_color(lv.color_hex(0x000000), 0)
-phase_btn_lbl.set_style_text_font(lv.font_montserrat_12, 0)
+theme.button(phase_btn, phase_btn_lbl)
 phase_btn_lbl.center()
 menu_buttons.append(phase_btn)  # Insert PHASE button as second button
 
@@ -261,8 +122,7 @@ for i, label in enumerate(["1Hz", "10Hz", "100Hz", "1kHz", "10kHz", "1MHz"]):
     btn.set_size(40, 20)
     lbl = lv.label(btn)
     lbl.set_text(label)
-    lbl.set_style_text_color(lv.color_hex(0x000000), 0)
-    lbl.set_style_text_font(lv.font_montserrat_12, 0)
+    theme.button(btn, lbl)
     lbl.center()
     menu_buttons.append(btn)
 
@@ -270,15 +130,13 @@ for i, label in enumerate(["1Hz", "10Hz", "100Hz", "1kHz", "10kHz", "1MHz"]):
 # --- Create frequency label once ---
 freq_label = lv.label(scrn)
 freq_label.set_pos(5, 100)
-freq_label.set_style_text_color(lv.color_hex(0xffffff), 0)
-freq_label.set_style_text_font(lv.font_montserrat_16, 0)
+theme.value(freq_label)
 freq_label.set_text(format_frequency(currentFreq))
 
 # --- Create phase label ---
 phase_label = lv.label(scrn)
 phase_label.set_pos(5, 115)
-phase_label.set_style_text_color(lv.color_hex(0xffffff), 0)
-phase_label.set_style_text_font(lv.font_montserrat_12, 0)
+theme.text(phase_label)
 phase_label.set_text(f"Phase: {currentPhase}°")
 
 drawMenu()
@@ -286,12 +144,16 @@ drawMenu()
 # temp.value(1)
 # display_bus.deinit()
 
-ad9833 = AD9833.AD9833(sdo=AD9833_SDO, clk=AD9833_CLK, cs=AD9833_CS,  fmclk=25)
-ad9833.set_frequency(currentFreq, 0)
-ad9833.set_phase(currentPhase, 0, rads=False)
-ad9833.set_phase((currentPhase + 180) % 360, 1, rads=False)
-ad9833.select_freq_phase(0, 0)
-ad9833.set_mode('SQUARE')
+if AD9833_SHARED_SPI:
+    ad9833 = AD9833.AD9833(cs=AD9833_CS, fmclk=25, spi_bus=display.spi_bus, lock=bus_lock)
+else:
+    ad9833 = AD9833.AD9833(sdo=AD9833_SDO, clk=AD9833_CLK, cs=AD9833_CS,  fmclk=25)
+with ad9833.batch():
+    ad9833.set_frequency(currentFreq, 0)
+    ad9833.set_phase(currentPhase, 0, rads=False)
+    ad9833.set_phase((currentPhase + 180) % 360, 1, rads=False)
+    ad9833.select_freq_phase(0, 0)
+    ad9833.set_mode('SQUARE')
 time.sleep(2)
 
 drawMenu()
@@ -356,17 +218,18 @@ while True:
 
     if b:
         print(currentFreqLabelIndex, currentFreq, currentPhase)
-        if currentFreqLabelIndex == 0:
-            ad9833.set_frequency(currentFreq, 0)
-            # ad9833.select_freq_phase(0, 0)
-            ad9833.set_mode('SQUARE')
-        elif currentFreqLabelIndex == 1:
-            ad9833.set_frequency(currentFreq, 0)
-            ad9833.set_phase((currentPhase + 180) % 360, 0, rads=False)
-            # ad9833.set_phase((currentPhase + 180) % 360, 1, rads=False)
-            ad9833.select_freq_phase(0, 0)
-            ad9833.set_mode('SIN')
-        elif currentFreqLabelIndex == 2:
-            ad9833.select_freq_phase(0, 0)
-            ad9833.set_frequency(currentFreq, 0)
-            ad9833.set_mode('TRIANGLE')
+        with ad9833.batch():  # one SPI transfer
+            if currentFreqLabelIndex == 0:
+                ad9833.set_frequency(currentFreq, 0)
+                # ad9833.select_freq_phase(0, 0)
+                ad9833.set_mode('SQUARE')
+            elif currentFreqLabelIndex == 1:
+                ad9833.set_frequency(currentFreq, 0)
+                ad9833.set_phase((currentPhase + 180) % 360, 0, rads=False)
+                # ad9833.set_phase((currentPhase + 180) % 360, 1, rads=False)
+                ad9833.select_freq_phase(0, 0)
+                ad9833.set_mode('SIN')
+            elif currentFreqLabelIndex == 2:
+                ad9833.select_freq_phase(0, 0)
+                ad9833.set_frequency(currentFreq, 0)
+                ad9833.set_mode('TRIANGLE')
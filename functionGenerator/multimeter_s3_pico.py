@@ -1,48 +1,31 @@
-import lcd_bus
+import lcd
 from micropython import const
 import machine
 from time import sleep
-import st7735
 import lvgl as lv
 import utime as time
 from fs_driver import fs_register
 from machine import Pin
 import AD9833
+import theme
 
 selected = 0
 selectedFreqBtn = 0
 current_freq = 4000
+shown = None  # button indexes drawn as selected
+shownFreqBtn = None
 
 
 def drawMenu():
-    # Only update button backgrounds and frequency label
-    global menu_buttons, freq_label, selected, selectedFreqBtn, current_freq
-    for i, btn in enumerate(menu_buttons):
-        if i == selected:
-            btn.set_style_bg_color(lv.color_hex(0xffffff), 0)
-        else:
-            btn.set_style_bg_color(lv.color_hex(0x8888dd), 0)
-
-    for i, btn in enumerate(freq_buttons):
-        if i == selectedFreqBtn:
-            btn.set_style_bg_color(lv.color_hex(0xffffff), 0)
-        else:
-            btn.set_style_bg_color(lv.color_hex(0x8888dd), 0)
-
-    freq_label.set_text(f"{current_freq} Hz")
-
-
-# display settings
-_WIDTH = 128
-_HEIGHT = 128
-_BL = 10
-_RST = 13
-_DC = 12
-
-_MOSI = 8  # SDA
-# _MISO = 9
-_SCK = 7  # SCL
-_HOST = 1  # SPI2
+    # Only the previously and newly selected buttons change state
+    global shown, shownFreqBtn
+    shown = theme.select(menu_buttons, shown, selected)
+    shownFreqBtn = theme.select(freq_buttons, shownFreqBtn, selectedFreqBtn)
+
+    text = f"{current_freq} Hz"
+    if freq_label.get_text() != text:  # set_text redraws even when unchanged
+        freq_label.set_text(text)
+
 
 # AD9833
 AD9833_SDO = 42
@@ -55,56 +38,18 @@ BUTTON1 = 6
 BUTTON2 = 1
 BUTTON3 = 2
 
-_LCD_CS = 11
-_LCD_FREQ = 4000000
-
-_OFFSET_X = 2
-_OFFSET_Y = 3
-
-spi_bus = machine.SPI.Bus(
-    host=_HOST,
-    mosi=_MOSI,
-    # miso=_MISO,
-    sck=_SCK
-)
-display_bus = lcd_bus.SPIBus(
-    spi_bus=spi_bus,
-    freq=_LCD_FREQ,
-    dc=_DC,
-    cs=_LCD_CS,
-)
-
-display = st7735.ST7735(
-    data_bus=display_bus,
-    display_width=_WIDTH,
-    display_height=_HEIGHT,
-    backlight_pin=_BL,
-    reset_pin=_RST,
-    reset_state=st7735.STATE_LOW,
-    backlight_on_state=st7735.STATE_HIGH,
-    color_space=lv.COLOR_FORMAT.RGB565,
-    color_byte_order=st7735.BYTE_ORDER_BGR,
-    rgb565_byte_swap=True,
-    offset_x=_OFFSET_X,
-    offset_y=_OFFSET_Y
-)
-
-print('s4')
-
-# Initialize display
-display.init(st7735.TYPE_R_RED)
-display.set_rotation(lv.DISPLAY_ROTATION._180)
-display.set_backlight(100)
+
+display = lcd.create('s3_128x128')
 
 # Create screen
 scrn = lv.screen_active()
-scrn.set_style_bg_color(lv.color_hex(0x000000), 0)
+theme.screen(scrn)
 
 fs_drv = lv.fs_drv_t()
 fs_register(fs_drv, "S")
 
 img = lv.image(scrn)
-img.set_src("S:colorful20.png")
+img.set_src("S:colorful20.bin")
 img.set_size(20, 20)
 img.set_pos(0, 5)
 
@@ -112,8 +57,7 @@ img.set_pos(0, 5)
 label = lv.label(scrn)
 label.set_text("Func Generator")
 label.set_pos(24, 8)
-label.set_style_text_color(lv.color_hex(0xffffff), 0)
-label.set_style_text_font(lv.font_montserrat_12, 0)
+theme.text(label)
 
 button0 = Pin(BUTTON0, Pin.IN, Pin.PULL_UP)  # Button pin
 button1 = Pin(BUTTON1, Pin.IN, Pin.PULL_UP)  # Button pin
@@ -130,8 +74,7 @@ for i, label in enumerate(menu_labels):
     btn.set_size(40, 20)
     lbl = lv.label(btn)
     lbl.set_text(label)
-    lbl.set_style_text_color(lv.color_hex(0x000000), 0)
-    lbl.set_style_text_font(lv.font_montserrat_12, 0)
+    theme.button(btn, lbl)
     lbl.center()
     menu_buttons.append(btn)
 
@@ -144,16 +87,14 @@ for i, label in enumerate(freq_btn_labels):
     btn.set_size(20, 20)
     lbl = lv.label(btn)
     lbl.set_text(label)
-    lbl.set_style_text_color(lv.color_hex(0x000000), 0)
-    lbl.set_style_text_font(lv.font_montserrat_12, 0)
+    theme.button(btn, lbl)
     lbl.center()
     freq_buttons.append(btn)
 
 # --- Create frequency label once ---
 freq_label = lv.label(scrn)
 freq_label.set_pos(10, 95)
-freq_label.set_style_text_color(lv.color_hex(0xffffff), 0)
-freq_label.set_style_text_font(lv.font_montserrat_16, 0)
+theme.value(freq_label)
 freq_label.set_text(f"{current_freq} Hz")
 
 drawMenu()
@@ -235,17 +176,18 @@ while True:
 
     if b:
         print(selected, current_freq)
-        if selected == 0:
-            ad9833.set_frequency(current_freq, 0)
-            ad9833.set_mode('SQUARE/2')
-        elif selected == 1:
-            ad9833.select_freq_phase(0, 0)
-            ad9833.set_frequency(current_freq, 0)
-            ad9833.set_mode('TRIANGLE')
-        elif selected == 2:
-            ad9833.set_frequency(1100, 0)
-            ad9833.set_frequency(2200, 1)
-            ad9833.set_phase(0, 0, rads=False)
-            ad9833.set_phase(180, 1, rads=False)
-            ad9833.select_freq_phase(0, 0)
-            ad9833.set_mode('SIN')
+        with ad9833.batch():  # one SPI transfer
+            if selected == 0:
+                ad9833.set_frequency(current_freq, 0)
+                ad9833.set_mode('SQUARE/2')
+            elif selected == 1:
+                ad9833.select_freq_phase(0, 0)
+                ad9833.set_frequency(current_freq, 0)
+                ad9833.set_mode('TRIANGLE')
+            elif selected == 2:
+                ad9833.set_frequency(1100, 0)
+                ad9833.set_frequency(2200, 1)
+                ad9833.set_phase(0, 0, rads=False)
+                ad9833.set_phase(180, 1, rads=False)
+                ad9833.select_freq_phase(0, 0)
+                ad9833.set_mode('SIN')
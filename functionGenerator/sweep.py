@@ -0,0 +1,122 @@
+"""sweep, linear and logarithmic frequency sweeps (chirps) on the AD9833
+
+A sweep is a hop table: the frequencies of all steps are computed once,
+turned into register words in an array('H') (hop.table) and played by a
+timer (hop.Player), so the callback only pushes three precomputed words
+per step and every step is a glitch free, phase continuous FS flip.
+
+    import sweep
+    s = sweep.Sweep(ad9833, 100, 10000, duration_ms=2000,
+                    spacing=sweep.LOG, repeat=sweep.PINGPONG)
+    s.start()
+    ...
+    s.stop()                    # or wait for s.player.running to drop
+
+duration_ms * rate_hz / 1000 steps of 6 bytes each, 2 s at 1 kHz is
+12 kB; lower rate_hz for long sweeps.
+"""
+
+import hop
+
+# spacing
+LIN = 'lin'
+LOG = 'log'
+
+# repeat modes
+ONCE = 'once'           # start -> stop, then hold stop
+REPEAT = 'repeat'       # start -> stop, start -> stop, ... (sawtooth)
+PINGPONG = 'pingpong'   # start -> stop -> start -> ... (triangle)
+
+
+def frequencies(start, stop, n, spacing=LIN, pingpong=False):
+    """frequencies, generator of n frequencies from start to stop (Hz),
+    both included, equally spaced (LIN) or with a constant ratio (LOG);
+    with pingpong followed by the way back without the end points"""
+
+    if n < 2:
+        raise ValueError('a sweep needs at least 2 steps')
+    if spacing == LOG:
+        if start <= 0 or stop <= 0:
+            raise ValueError('log sweep needs frequencies above 0')
+        ratio = (stop / start) ** (1 / (n - 1))
+    elif spacing != LIN:
+        raise ValueError('spacing must be LIN or LOG')
+    else:
+        step = (stop - start) / (n - 1)
+
+    for i in range(n):
+        yield start * ratio ** i if spacing == LOG else start + step * i
+    if pingpong:
+        for i in range(n - 2, 0, -1):
+            yield start * ratio ** i if spacing == LOG else start + step * i
+
+
+class Sweep:
+
+    def __init__(self, dds, start, stop, duration_ms, rate_hz=1000, spacing=LIN, repeat=ONCE, timer_id=0):
+        """__init__, precompute a sweep from start to stop Hz taking
+        duration_ms, one step per timer tick at rate_hz"""
+
+        if repeat not in (ONCE, REPEAT, PINGPONG):
+            raise ValueError('repeat must be ONCE, REPEAT or PINGPONG')
+        if max(start, stop) > dds.fmclk / 2:
+            raise ValueError('frequency above fmclk / 2')
+
+        self.dds = dds
+        self.start_hz = start
+        self.stop_hz = stop
+        self.rate_hz = rate_hz
+        self.repeat = repeat
+        self.spacing = spacing
+        self.n = max(2, duration_ms * rate_hz // 1000)
+        self.timer_id = timer_id
+        self.player = None
+        self._build()
+        return
+
+    def _build(self):
+        # the table starts on the register the chip is not using now
+        # the frequencies are generated while the table is filled, only
+        # the register words are kept
+        freqs = frequencies(self.start_hz, self.stop_hz, self.n, self.spacing, self.repeat == PINGPONG)
+        words = hop.table(self.dds, freqs, loop=self.repeat != ONCE)
+        if self.player is None:
+            self.player = hop.Player(self.dds, words, self.timer_id)
+        else:
+            self.player.words = words
+            self.player.n = len(words)
+        return
+
+    def start(self):
+        """start, run the sweep from the start frequency"""
+
+        if not self.player.ready():
+            # the output moved to the other register since the table
+            # was built, rebuild it so no step writes the active one
+            self._build()
+        self.player.start(self.rate_hz, repeat=self.repeat != ONCE)
+        return
+
+    def stop(self):
+        """stop, halt the sweep and hold the current frequency"""
+
+        self.player.stop()
+        return
+
+
+if __name__ == "__main__":
+
+    import AD9833
+    import utime as time
+
+    ad9833 = AD9833.AD9833(sdo=1, clk=2, cs=22, fmclk=25)
+    ad9833.set_frequency(100, 0)
+    ad9833.select_freq_phase(0, 0)
+    ad9833.set_mode('SIN')
+
+    # 100 Hz to 10 kHz and back, 1 s each way
+    s = Sweep(ad9833, 100, 10000, duration_ms=1000, rate_hz=500, spacing=LOG, repeat=PINGPONG)
+    s.start()
+    time.sleep(10)
+    s.stop()
+    print('steps', s.player.steps, 'skipped', s.player.skipped, 'laps', s.player.laps)
@@ -0,0 +1,117 @@
+"""theme, shared LVGL styles for the function generator screens
+
+Every label and button used to get its own local text colour, font and
+background with set_style_*(), and drawMenu() restyled every button on
+each key press. Here each look is one lv.style_t shared by all objects,
+and the selected look is bound to the CHECKED state, so moving the
+selection changes the state of two buttons and LVGL redraws only those.
+
+    import theme
+    theme.screen(scrn)
+    theme.text(label)                 # white, 12 px
+    theme.value(freq_label)           # white, 16 px
+    theme.button(btn, lbl)            # menu button and its label
+    shown = theme.select(menu_buttons, shown, selected)
+"""
+
+import lvgl as lv
+
+SELECTED = lv.STATE.CHECKED
+
+BACKGROUND = 0x000000
+TEXT = 0xffffff
+BUTTON = 0x8888dd
+BUTTON_SELECTED = 0xffffff
+BUTTON_TEXT = 0x000000
+
+_styles = None
+
+
+def _init():
+    global _styles
+
+    scrn = lv.style_t()
+    scrn.init()
+    scrn.set_bg_color(lv.color_hex(BACKGROUND))
+
+    text = lv.style_t()
+    text.init()
+    text.set_text_color(lv.color_hex(TEXT))
+    text.set_text_font(lv.font_montserrat_12)
+
+    value = lv.style_t()
+    value.init()
+    value.set_text_color(lv.color_hex(TEXT))
+    value.set_text_font(lv.font_montserrat_16)
+
+    button = lv.style_t()
+    button.init()
+    button.set_bg_color(lv.color_hex(BUTTON))
+
+    selected = lv.style_t()
+    selected.init()
+    selected.set_bg_color(lv.color_hex(BUTTON_SELECTED))
+
+    button_text = lv.style_t()
+    button_text.init()
+    button_text.set_text_color(lv.color_hex(BUTTON_TEXT))
+    button_text.set_text_font(lv.font_montserrat_12)
+
+    _styles = {
+        'screen': scrn,
+        'text': text,
+        'value': value,
+        'button': button,
+        'selected': selected,
+        'button_text': button_text,
+    }
+    return
+
+
+def style(name):
+    """style, the shared lv.style_t by name (created on first use)"""
+
+    if _styles is None:
+        _init()
+    return _styles[name]
+
+
+def screen(scrn):
+    """screen, black background"""
+
+    scrn.add_style(style('screen'), 0)
+    return
+
+
+def text(label):
+    """text, normal white label"""
+
+    label.add_style(style('text'), 0)
+    return
+
+
+def value(label):
+    """value, large white label for readouts"""
+
+    label.add_style(style('value'), 0)
+    return
+
+
+def button(btn, lbl=None):
+    """button, menu button; its CHECKED state is the selected look"""
+
+    btn.add_style(style('button'), 0)
+    btn.add_style(style('selected'), SELECTED)
+    if lbl is not None:
+        lbl.add_style(style('button_text'), 0)
+    return
+
+
+def select(buttons, old, new):
+    """select, move the selected state from buttons[old] to buttons[new]
+    (old may be None for the first call), returns new"""
+
+    if old is not None and old != new:
+        buttons[old].remove_state(SELECTED)
+    buttons[new].add_state(SELECTED)
+    return new
@@ -0,0 +1,217 @@
+"""imagecache, decoded image cache with a byte budget and LRU eviction
+
+img.set_src("S:blue.png") re-reads and re-decodes the file on every
+switch. ImageCache keeps the decoded RGB565 pixels in RAM, keyed by
+path and size, and hands out ready lv.image_dsc_t objects, so switching
+between a few screens is a dict lookup instead of a decode.
+
+    import imagecache
+    cache = imagecache.ImageCache(budget=48 * 1024)
+    img.set_src(cache.get("S:blue.bin"))
+    img.set_src(cache.get("S:colorful.png", 64, 64))
+    print(cache.hits, cache.misses, cache.used)
+
+.bin files from tools/img2lvgl.py are read straight into the buffer,
+anything else goes through LVGL's image decoder once; the PNG decoders
+give (A)RGB8888, which is converted to RGB565, or RGB565A8 when the
+image has transparent pixels. When a size is
+given and differs from the image, it is scaled (nearest neighbour) once
+at load time.
+
+The cache owns the pixel buffers: an evicted image must not stay on
+screen, so set_src() the result of get() right away and size the budget
+for every image that can be visible at the same time.
+"""
+
+import struct
+import lvgl as lv
+
+# lv_color_format_t
+CF_RGB888 = 0x0F
+CF_ARGB8888 = 0x10
+CF_XRGB8888 = 0x11
+CF_RGB565 = 0x12
+CF_RGB565A8 = 0x14
+IMAGE_HEADER_MAGIC = 0x19
+
+
+def _dsc(cf, w, h, data):
+    return lv.image_dsc_t({
+        'header': {'magic': IMAGE_HEADER_MAGIC, 'cf': cf, 'w': w, 'h': h, 'stride': w * 2},
+        'data_size': len(data),
+        'data': data,
+    })
+
+
+def load_bin(path):
+    """load_bin, (cf, w, h, data) from an LVGL v9 .bin image"""
+
+    if path[1:2] == ':':
+        path = path[2:]
+    with open(path, 'rb') as f:
+        magic, cf, flags, w, h, stride, _ = struct.unpack('<BBHHHHH', f.read(12))
+        if magic != IMAGE_HEADER_MAGIC or cf not in (CF_RGB565, CF_RGB565A8):
+            raise ValueError('not an RGB565 LVGL image: %s' % path)
+        size = w * h * (3 if cf == CF_RGB565A8 else 2)
+        data = bytearray(size)
+        f.readinto(data)
+    return cf, w, h, data
+
+
+def to_rgb565(cf, w, h, stride, data):
+    """to_rgb565, (cf, data) as RGB565, or RGB565A8 when an ARGB8888
+    image has transparent pixels, from RGB888/(A|X)RGB8888 pixels
+    (B, G, R[, A] bytes in memory)"""
+
+    bpp = 3 if cf == CF_RGB888 else 4
+    alpha = False
+    if cf == CF_ARGB8888:
+        for y in range(h):
+            o = y * stride + 3
+            for x in range(w):
+                if data[o + x * 4] != 255:
+                    alpha = True
+                    break
+            if alpha:
+                break
+
+    out = bytearray(w * h * (3 if alpha else 2))
+    a_dst = w * h * 2
+    o = 0
+    for y in range(h):
+        i = y * stride
+        for x in range(w):
+            b = data[i]
+            g = data[i + 1]
+            r = data[i + 2]
+            c = ((r & 0xF8) << 8) | ((g & 0xFC) << 3) | (b >> 3)
+            out[o * 2] = c & 0xFF
+            out[o * 2 + 1] = c >> 8
+            if alpha:
+                out[a_dst + o] = data[i + 3]
+            i += bpp
+            o += 1
+    return (CF_RGB565A8 if alpha else CF_RGB565), out
+
+
+def decode(path):
+    """decode, (cf, w, h, data) through LVGL's image decoder"""
+
+    dsc = lv.image_decoder_dsc_t()
+    if lv.image_decoder_open(dsc, path, None) != lv.RESULT.OK:
+        raise OSError('cannot decode %s' % path)
+    try:
+        decoded = dsc.decoded
+        header = decoded.header
+        cf = header.cf
+        w = header.w
+        h = header.h
+        stride = header.stride
+        raw = decoded.data.__dereference__(decoded.data_size)
+        if cf in (CF_RGB888, CF_ARGB8888, CF_XRGB8888):
+            # the PNG decoders, convert while the decoder still owns raw
+            cf, data = to_rgb565(cf, w, h, stride, raw)
+        else:
+            data = bytearray(raw)
+    finally:
+        lv.image_decoder_close(dsc)
+    if cf not in (CF_RGB565, CF_RGB565A8):
+        raise ValueError('decoder gave colour format %d for %s' % (cf, path))
+    return cf, w, h, data
+
+
+def scale(cf, w, h, data, nw, nh):
+    """scale, nearest neighbour resize of RGB565 (+A8 plane) pixels"""
+
+    alpha = cf == CF_RGB565A8
+    out = bytearray(nw * nh * (3 if alpha else 2))
+    a_src = w * h * 2
+    a_dst = nw * nh * 2
+    o = 0
+    for y in range(nh):
+        row = (y * h // nh) * w
+        for x in range(nw):
+            i = row + x * w // nw
+            out[o * 2] = data[i * 2]
+            out[o * 2 + 1] = data[i * 2 + 1]
+            if alpha:
+                out[a_dst + o] = data[a_src + i]
+            o += 1
+    return out
+
+
+class ImageCache:
+
+    def __init__(self, budget=32 * 1024):
+        """__init__, budget is the maximum bytes of cached pixels"""
+
+        self.budget = budget
+        self.used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.entries = {}
+        # least recently used first
+        self.order = []
+        self.uncached = None
+        return
+
+    def get(self, path, w=0, h=0):
+        """get, lv.image_dsc_t for path, optionally scaled to w x h"""
+
+        key = (path, w, h)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self.order.remove(key)
+            self.order.append(key)
+            return entry[0]
+
+        self.misses += 1
+        if path.endswith('.bin'):
+            cf, iw, ih, data = load_bin(path)
+        else:
+            cf, iw, ih, data = decode(path)
+        if w and h and (w != iw or h != ih):
+            data = scale(cf, iw, ih, data, w, h)
+            iw = w
+            ih = h
+        dsc = _dsc(cf, iw, ih, data)
+
+        size = len(data)
+        if size > self.budget:
+            # too big to keep, hand it out uncached; hold the pixels
+            # until the next oversized get() so they outlive set_src()
+            self.uncached = (dsc, data)
+            return dsc
+        self._evict(self.budget - size)
+        self.entries[key] = (dsc, data)
+        self.order.append(key)
+        self.used += size
+        return dsc
+
+    def _evict(self, limit):
+        while self.used > limit and self.order:
+            key = self.order.pop(0)
+            dsc, data = self.entries.pop(key)
+            self.used -= len(data)
+            self.evictions += 1
+        return
+
+    def clear(self):
+        """clear, drop every cached image"""
+
+        self._evict(0)
+        return
+
+    def stats(self):
+        """stats, hit/miss counters and memory use"""
+
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': len(self.entries),
+            'used': self.used,
+            'budget': self.budget,
+        }
@@ -0,0 +1,264 @@
+"""lcd, shared ST7735 bring-up for the demos in this repo
+
+Every demo used to repeat the same machine.SPI.Bus -> lcd_bus.SPIBus ->
+st7735.ST7735 -> init/set_rotation sequence with its own pin constants.
+Pick a board profile instead and override what you need:
+
+    import lcd
+    display = lcd.create('c6_zero_128x128')
+    display = lcd.create('c6_128x128', freq=4000000, buf_lines=32, double_buffer=True)
+
+Other SPI devices can share the display bus, see bus_lock():
+
+    lock = lcd.bus_lock(display)
+    dds = AD9833.AD9833(cs=22, spi_bus=display.spi_bus, lock=lock)
+
+Draw buffer tuning (RAM versus FPS):
+    buf_lines      - rows per draw buffer, one buffer = width * buf_lines * 2 bytes
+    double_buffer  - allocate a second buffer so LVGL renders while SPI sends
+    full_render    - LVGL renders the whole screen every refresh (forces
+                     buf_lines to the full height)
+"""
+
+import lcd_bus
+import machine
+import st7735
+import lvgl as lv
+import utime as time
+
+PROFILES = {
+    # ESP32-C6 dev board wiring: basic/, 128x128/, snake/, gas_sensors/
+    'c6_128x128': {
+        'width': 128, 'height': 128,
+        'bl': 19, 'rst': 14, 'dc': 15, 'mosi': 21, 'sck': 22, 'cs': 18, 'host': 1,
+        'freq': 2000000, 'offset_x': 2, 'offset_y': 3,
+        'byte_order': st7735.BYTE_ORDER_BGR, 'panel': st7735.TYPE_R_RED,
+        'rotation': lv.DISPLAY_ROTATION._180, 'inversion': False,
+        'buf_lines': 16, 'double_buffer': False, 'full_render': False,
+    },
+    # Waveshare ESP32-C6 Zero wiring: basic/image.py, functionGenerator/multimeter_c6*.py
+    'c6_zero_128x128': {
+        'width': 128, 'height': 128,
+        'bl': 21, 'rst': 18, 'dc': 19, 'mosi': 15, 'sck': 14, 'cs': 20, 'host': 1,
+        'freq': 4000000, 'offset_x': 2, 'offset_y': 3,
+        'byte_order': st7735.BYTE_ORDER_BGR, 'panel': st7735.TYPE_R_RED,
+        'rotation': lv.DISPLAY_ROTATION._180, 'inversion': False,
+        'buf_lines': 16, 'double_buffer': False, 'full_render': False,
+    },
+    # Waveshare ESP32-C6 Zero with the 128x160 green tab panel: 128x160/
+    'c6_zero_128x160': {
+        'width': 128, 'height': 160,
+        'bl': 21, 'rst': 18, 'dc': 19, 'mosi': 15, 'sck': 14, 'cs': 20, 'host': 1,
+        'freq': 4000000, 'offset_x': 0, 'offset_y': 0,
+        'byte_order': st7735.BYTE_ORDER_RGB, 'panel': st7735.TYPE_R_GREEN,
+        'rotation': lv.DISPLAY_ROTATION._180, 'inversion': False,
+        'buf_lines': 16, 'double_buffer': False, 'full_render': False,
+    },
+    # 0.96" 80x160 IPS panel on the C6 dev board wiring, needs inversion: 80x160/
+    'c6_80x160': {
+        'width': 80, 'height': 160,
+        'bl': 19, 'rst': 14, 'dc': 15, 'mosi': 21, 'sck': 22, 'cs': 18, 'host': 1,
+        'freq': 2000000, 'offset_x': 26, 'offset_y': 1,
+        'byte_order': st7735.BYTE_ORDER_BGR, 'panel': st7735.TYPE_R_RED,
+        'rotation': None, 'inversion': True,
+        'buf_lines': 16, 'double_buffer': False, 'full_render': False,
+    },
+    # ESP32-S3 wiring: functionGenerator/multimeter_s3*.py
+    's3_128x128': {
+        'width': 128, 'height': 128,
+        'bl': 10, 'rst': 13, 'dc': 12, 'mosi': 8, 'sck': 7, 'cs': 11, 'host': 1,
+        'freq': 4000000, 'offset_x': 2, 'offset_y': 3,
+        'byte_order': st7735.BYTE_ORDER_BGR, 'panel': st7735.TYPE_R_RED,
+        'rotation': lv.DISPLAY_ROTATION._180, 'inversion': False,
+        'buf_lines': 16, 'double_buffer': False, 'full_render': False,
+    },
+}
+
+
+def get_profile(name, **overrides):
+    """get_profile, return a copy of a board profile with overrides applied"""
+
+    if name not in PROFILES:
+        raise ValueError('unknown display profile: %s' % name)
+
+    profile = dict(PROFILES[name])
+    for key in overrides:
+        if key not in profile:
+            raise ValueError('unknown display setting: %s' % key)
+        profile[key] = overrides[key]
+
+    if profile['full_render']:
+        profile['buf_lines'] = profile['height']
+    return profile
+
+
+def buffer_size(profile):
+    """buffer_size, bytes in one RGB565 draw buffer for a profile"""
+
+    return profile['width'] * profile['buf_lines'] * 2
+
+
+def create(name='c6_128x128', **overrides):
+    """create, bring up the SPI bus, the panel and the LVGL display
+    for a named board profile and return the st7735 display.
+
+    The machine.SPI.Bus is kept on display.spi_bus so other devices
+    can be attached to the same bus."""
+
+    lv.init()
+    profile = get_profile(name, **overrides)
+
+    spi_bus = machine.SPI.Bus(
+        host=profile['host'],
+        mosi=profile['mosi'],
+        sck=profile['sck']
+    )
+
+    display_bus = lcd_bus.SPIBus(
+        spi_bus=spi_bus,
+        freq=profile['freq'],
+        dc=profile['dc'],
+        cs=profile['cs'],
+    )
+
+    # allocate the draw buffers ourselves so their size is tunable
+    size = buffer_size(profile)
+    caps = lcd_bus.MEMORY_INTERNAL | lcd_bus.MEMORY_DMA
+    frame_buffer1 = display_bus.allocate_framebuffer(size, caps)
+    frame_buffer2 = None
+    if profile['double_buffer']:
+        frame_buffer2 = display_bus.allocate_framebuffer(size, caps)
+
+    display = st7735.ST7735(
+        data_bus=display_bus,
+        display_width=profile['width'],
+        display_height=profile['height'],
+        frame_buffer1=frame_buffer1,
+        frame_buffer2=frame_buffer2,
+        backlight_pin=profile['bl'],
+        reset_pin=profile['rst'],
+        reset_state=st7735.STATE_LOW,
+        backlight_on_state=st7735.STATE_HIGH,
+        color_space=lv.COLOR_FORMAT.RGB565,
+        color_byte_order=profile['byte_order'],
+        rgb565_byte_swap=True,
+        offset_x=profile['offset_x'],
+        offset_y=profile['offset_y']
+    )
+
+    if profile['full_render']:
+        display._disp_drv.set_render_mode(lv.DISPLAY_RENDER_MODE.FULL)
+
+    display.init(profile['panel'])
+    if profile['inversion']:
+        display.set_color_inversion(True)
+    if profile['rotation'] is not None:
+        display.set_rotation(profile['rotation'])
+    display.set_backlight(100)
+
+    display.spi_bus = spi_bus
+    display.profile = profile
+    # heap_caps buffers outside the GC heap, release() frees them
+    display.frame_buffer1 = frame_buffer1
+    display.frame_buffer2 = frame_buffer2
+    return display
+
+
+def release(display):
+    """release, tear down a display from create() so another
+    configuration can be brought up (used by the benchmarks)"""
+
+    display._disp_drv.delete()
+    bus = display._data_bus
+    for buf in (display.frame_buffer1, display.frame_buffer2):
+        if buf is not None:
+            bus.free_framebuffer(buf)
+    display.frame_buffer1 = None
+    display.frame_buffer2 = None
+    bus.deinit()
+    display.spi_bus.deinit()
+    return
+
+
+class BusLock:
+    """BusLock, keeps other devices off the SPI bus while a display
+    flush is in flight (flush start to flush ready, the DMA runs in
+    between). Device writes are synchronous, so LVGL never finds the bus
+    taken by them."""
+
+    def __init__(self, timeout_us=50000):
+        """__init__, timeout_us is how long acquire() waits by default"""
+
+        self.timeout_us = timeout_us
+        self.lcd_busy = False
+        self.waits = 0
+        self.refused = 0
+        return
+
+    def acquire(self, timeout_us=0):
+        """acquire, wait for the running flush to finish; False on
+        timeout (self.timeout_us unless given). Only call from the main
+        loop, never from a callback that can interrupt a flush."""
+
+        if not self.lcd_busy:
+            return True
+        if not timeout_us:
+            timeout_us = self.timeout_us
+        self.waits += 1
+        start = time.ticks_us()
+        while self.lcd_busy:
+            if time.ticks_diff(time.ticks_us(), start) > timeout_us:
+                return False
+        return True
+
+    def try_acquire(self):
+        """try_acquire, True when the bus is free right now (for timer
+        callbacks, which must not wait)"""
+
+        if self.lcd_busy:
+            self.refused += 1
+            return False
+        return True
+
+
+def bus_lock(display):
+    """bus_lock, wrap the display flush so a shared BusLock knows when
+    the bus is in use, returns the lock (display.bus_lock)
+
+    Install it before perf.FlushProfiler so the profiler wraps it. The
+    wait timeout is twice the wire time of one full draw buffer at the
+    profile's clock, plus 10 ms."""
+
+    profile = display.profile
+    flush_us = buffer_size(profile) * 8 * 1000000 // profile['freq']
+    lock = BusLock(timeout_us=2 * flush_us + 10000)
+    flush_cb = display._flush_cb
+    flush_ready_cb = display._flush_ready_cb
+
+    def locked_flush_cb(disp, area, color_p):
+        lock.lcd_busy = True
+        flush_cb(disp, area, color_p)
+
+    def locked_flush_ready_cb(*args):
+        # may run from the SPI done interrupt
+        lock.lcd_busy = False
+        flush_ready_cb(*args)
+
+    # instance attributes, so code that re-registers display._flush_cb or
+    # display._flush_ready_cb (perf.py, stripimage.py) keeps the lock
+    display._flush_cb = locked_flush_cb
+    display._flush_ready_cb = locked_flush_ready_cb
+    display._disp_drv.set_flush_cb(locked_flush_cb)
+    display._data_bus.register_callback(locked_flush_ready_cb)
+    display.bus_lock = lock
+    return lock
+
+
+def get_bus_lock(display):
+    """get_bus_lock, the display's BusLock, installing one on first use
+    (stripimage.py and vscroll.py wait on it before taking the bus)"""
+
+    lock = getattr(display, 'bus_lock', None)
+    if lock is None:
+        lock = bus_lock(display)
+    return lock
@@ -0,0 +1,223 @@
+"""perf, per-frame flush profiler and on-screen FPS/CPU overlay
+
+Wraps the st7735 flush path of a display created with lcd.create (or the
+sim/ stand-in) and records, for every refreshed frame:
+
+    dirty area  - union of the flushed areas (x1, y1, x2, y2)
+    bytes       - pixel bytes pushed over SPI
+    flush_us    - time from flush start to the bus reporting it done
+    render_us   - time spent inside lv.task_handler (or lv.refr_now)
+                  outside of flushing
+
+The counters live in fixed size array ring buffers, nothing is allocated
+per frame. Hook it into the main loop with attach():
+
+    import perf
+    prof = perf.FlushProfiler(display, frames=64, overlay=True)
+    loop = runloop.RunLoop()
+    prof.attach(loop)
+    ...
+    prof.report()
+
+Scripts that redraw with lv.refr_now() call prof.refr_now(disp) instead,
+frames flushed outside both wrappers keep render_us 0.
+"""
+
+from array import array
+import lvgl as lv
+import utime as time
+
+
+class FlushProfiler:
+
+    def __init__(self, display, frames=64, overlay=False):
+        """__init__, frames is the ring buffer depth"""
+
+        self.display = display
+        self.size = frames
+        self.x1 = array('h', [0] * frames)
+        self.y1 = array('h', [0] * frames)
+        self.x2 = array('h', [0] * frames)
+        self.y2 = array('h', [0] * frames)
+        self.nbytes = array('I', [0] * frames)
+        self.flush_us = array('I', [0] * frames)
+        self.render_us = array('I', [0] * frames)
+        self.stamp_ms = array('I', [0] * frames)
+        self.count = 0
+
+        # state of the frame being rendered
+        self._reset_frame()
+        self._flush_start = 0
+        self._handler_flush_us = 0
+
+        # totals for the overlay and CPU load
+        self.busy_us = 0
+        self.window_start = time.ticks_ms()
+        self.window_frames = 0
+        self.window_busy_us = 0
+        self.fps = 0
+        self.cpu = 0
+
+        self._orig_flush_cb = display._flush_cb
+        self._orig_ready_cb = display._flush_ready_cb
+        # instance attributes too, like lcd.bus_lock, so code that puts
+        # display._flush_ready_cb back (stripimage.py, vscroll.py) keeps
+        # the profiler in the chain
+        display._flush_cb = self._flush_cb
+        display._flush_ready_cb = self._flush_ready_cb
+        display._disp_drv.set_flush_cb(self._flush_cb)
+        display._data_bus.register_callback(self._flush_ready_cb)
+
+        self.label = None
+        if overlay:
+            self.show_overlay()
+        return
+
+    def _reset_frame(self):
+        self._fx1 = 0x7FFF
+        self._fy1 = 0x7FFF
+        self._fx2 = -1
+        self._fy2 = -1
+        self._fbytes = 0
+        self._fflush_us = 0
+        self._frame_done = False
+
+    def _flush_cb(self, disp, area, color_p):
+        self._flush_start = time.ticks_us()
+        if area.x1 < self._fx1:
+            self._fx1 = area.x1
+        if area.y1 < self._fy1:
+            self._fy1 = area.y1
+        if area.x2 > self._fx2:
+            self._fx2 = area.x2
+        if area.y2 > self._fy2:
+            self._fy2 = area.y2
+        self._fbytes += (area.x2 - area.x1 + 1) * (area.y2 - area.y1 + 1) * 2
+        self._frame_done = disp.flush_is_last()
+        self._orig_flush_cb(disp, area, color_p)
+
+    def _flush_ready_cb(self, *args):
+        # may run from the SPI done interrupt, keep it allocation free
+        spent = time.ticks_diff(time.ticks_us(), self._flush_start)
+        self._fflush_us += spent
+        self._handler_flush_us += spent
+        if self._frame_done:
+            self._record()
+        self._orig_ready_cb(*args)
+
+    def _record(self):
+        i = self.count % self.size
+        self.x1[i] = self._fx1
+        self.y1[i] = self._fy1
+        self.x2[i] = self._fx2
+        self.y2[i] = self._fy2
+        self.nbytes[i] = self._fbytes
+        self.flush_us[i] = self._fflush_us
+        self.render_us[i] = 0
+        self.stamp_ms[i] = time.ticks_ms()
+        self.count += 1
+        self.window_frames += 1
+        self._reset_frame()
+
+    def task_handler(self):
+        """task_handler, lv.task_handler with render time accounting"""
+
+        start = time.ticks_us()
+        count = self.count
+        self._handler_flush_us = 0
+        wait = lv.task_handler()
+        self._account(start, count)
+        return wait
+
+    def refr_now(self, disp=None):
+        """refr_now, lv.refr_now with the same render time accounting"""
+
+        start = time.ticks_us()
+        count = self.count
+        self._handler_flush_us = 0
+        lv.refr_now(disp)
+        self._account(start, count)
+        return
+
+    def _account(self, start, count):
+        # busy time of one task_handler/refr_now call, minus the flushes
+        # is the render time of the frame it completed
+        busy = time.ticks_diff(time.ticks_us(), start)
+        self.busy_us += busy
+        self.window_busy_us += busy
+
+        if self.count != count:
+            render = busy - self._handler_flush_us
+            self.render_us[(self.count - 1) % self.size] = render if render > 0 else 0
+
+    def attach(self, loop):
+        """attach, make a runloop.RunLoop go through the profiler"""
+
+        loop.task_handler = self.task_handler
+        return
+
+    def frames(self):
+        """frames, recorded frames oldest first as
+        (x1, y1, x2, y2, bytes, flush_us, render_us) tuples"""
+
+        n = min(self.count, self.size)
+        out = []
+        for k in range(self.count - n, self.count):
+            i = k % self.size
+            out.append((self.x1[i], self.y1[i], self.x2[i], self.y2[i],
+                        self.nbytes[i], self.flush_us[i], self.render_us[i]))
+        return out
+
+    def summary(self):
+        """summary, averages over the frames in the ring buffer"""
+
+        n = min(self.count, self.size)
+        if n == 0:
+            return {'frames': 0}
+        nbytes = flush = render = 0
+        for k in range(self.count - n, self.count):
+            i = k % self.size
+            nbytes += self.nbytes[i]
+            flush += self.flush_us[i]
+            render += self.render_us[i]
+        first = self.stamp_ms[(self.count - n) % self.size]
+        last = self.stamp_ms[(self.count - 1) % self.size]
+        span = time.ticks_diff(last, first)
+        return {
+            'frames': self.count,
+            'fps': (n - 1) * 1000 // span if span > 0 else 0,
+            'avg_bytes': nbytes // n,
+            'avg_flush_us': flush // n,
+            'avg_render_us': render // n,
+            'bound': 'spi' if flush > render else 'render',
+        }
+
+    def report(self):
+        """report, print the summary"""
+
+        print(self.summary())
+        return
+
+    def show_overlay(self):
+        """show_overlay, small FPS/CPU label on the top layer,
+        refreshed once a second"""
+
+        self.label = lv.label(lv.layer_top())
+        self.label.set_style_text_color(lv.color_hex(0xffff00), 0)
+        self.label.set_style_bg_color(lv.color_hex(0x000000), 0)
+        self.label.set_style_bg_opa(lv.OPA.COVER, 0)
+        self.label.set_style_text_font(lv.font_montserrat_12, 0)
+        self.label.align(lv.ALIGN.BOTTOM_RIGHT, 0, 0)
+        self.label.set_text('--')
+        self.timer = lv.timer_create(self._update_overlay, 1000, None)
+        return
+
+    def _update_overlay(self, timer):
+        now = time.ticks_ms()
+        elapsed = time.ticks_diff(now, self.window_start) or 1
+        self.fps = self.window_frames * 1000 // elapsed
+        self.cpu = self.window_busy_us // 10 // elapsed
+        self.window_start = now
+        self.window_frames = 0
+        self.window_busy_us = 0
+        self.label.set_text('%d fps %d%%' % (self.fps, self.cpu))
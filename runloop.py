@@ -0,0 +1,243 @@
+"""runloop, deadline driven LVGL main loop
+
+Replaces the `sleep_ms(20); lv.tick_inc(time_passed); lv.task_handler()`
+loops. lv.tick_inc is fed from the monotonic clock and the loop sleeps
+until the next LVGL timer deadline reported by lv.task_handler, or until
+the next update() call is due, whichever comes first.
+
+    import runloop
+    loop = runloop.RunLoop()
+    loop.run(update, period_ms=20)   # update() every 20 ms, LVGL as needed
+
+For game logic use run_fixed() instead: step() runs on a fixed timestep
+whose deadlines do not drift with render time, missed steps are caught
+up (at most max_catchup at once), and loop.clock counts late and dropped
+steps.
+
+    loop.run_fixed(step, period_ms=200, render=draw)
+
+When nothing is invalidated LVGL pauses its refresh timer and
+task_handler reports no pending timer; the loop then idles for
+max_sleep_ms instead of spinning.
+"""
+
+import lvgl as lv
+import utime as time
+
+# lv.task_handler() return value when no LVGL timer is ready
+NO_TIMER_READY = 0xFFFFFFFF
+
+
+class FixedStep:
+
+    def __init__(self, period_ms, max_catchup=4, late_ms=0):
+        """__init__, one step every period_ms; a step that runs more than
+        late_ms (default a quarter period) after its deadline is late,
+        steps beyond max_catchup behind are dropped"""
+
+        self.period_ms = period_ms
+        self.max_catchup = max_catchup
+        self.late_ms = late_ms
+        self.next = time.ticks_add(time.ticks_ms(), period_ms)
+        self.reset_stats()
+        return
+
+    def reset_stats(self):
+        """reset_stats, clear the step counters"""
+
+        self.steps = 0
+        self.late = 0
+        self.dropped = 0
+        self.max_behind_ms = 0
+        return
+
+    def set_period(self, period_ms):
+        """set_period, change the step length from the next deadline on"""
+
+        if period_ms != self.period_ms:
+            self.next = time.ticks_add(self.next, period_ms - self.period_ms)
+            self.period_ms = period_ms
+        return
+
+    def due(self):
+        """due, how many steps to run now, deadlines advance by whole
+        periods so the schedule never drifts"""
+
+        behind = time.ticks_diff(time.ticks_ms(), self.next)
+        if behind < 0:
+            return 0
+        period = self.period_ms
+        n = behind // period + 1
+        if behind > self.max_behind_ms:
+            self.max_behind_ms = behind
+        late_ms = self.late_ms or period // 4
+        self.next = time.ticks_add(self.next, n * period)
+        drop = 0
+        if n > self.max_catchup:
+            # the oldest steps are dropped, the newest max_catchup run
+            drop = n - self.max_catchup
+            self.dropped += drop
+            n = self.max_catchup
+        # step k of the batch (dropped ones first) is behind - k * period
+        # late, count only the steps that run
+        if behind > late_ms:
+            late = (behind - late_ms - 1) // period + 1 - drop
+            if late > 0:
+                self.late += min(n, late)
+        self.steps += n
+        return n
+
+    def wait_ms(self):
+        """wait_ms, ms until the next step is due"""
+
+        return max(0, time.ticks_diff(self.next, time.ticks_ms()))
+
+    def alpha(self):
+        """alpha, 0.0 .. 1.0 progress from the last step to the next,
+        for interpolating what is drawn between steps"""
+
+        a = 1 - self.wait_ms() / self.period_ms
+        return 0.0 if a < 0 else a
+
+    def stats(self):
+        """stats, step counters"""
+
+        return {
+            'steps': self.steps,
+            'late': self.late,
+            'dropped': self.dropped,
+            'max_behind_ms': self.max_behind_ms,
+            'period_ms': self.period_ms,
+        }
+
+
+class RunLoop:
+
+    def __init__(self, max_sleep_ms=100):
+        """__init__, max_sleep_ms bounds the idle sleep so update()
+        callbacks and polled inputs are still serviced"""
+
+        self.max_sleep_ms = max_sleep_ms
+        # perf.FlushProfiler.attach() swaps in its timed version
+        self.task_handler = lv.task_handler
+        self.last_tick = time.ticks_ms()
+        self.reset_stats()
+        return
+
+    def reset_stats(self):
+        """reset_stats, clear the loop-time statistics"""
+
+        self.loops = 0
+        self.idle_loops = 0
+        self.busy_us = 0
+        self.max_busy_us = 0
+        self.sleep_ms = 0
+        self.stats_start = time.ticks_ms()
+        return
+
+    def tick(self):
+        """tick, advance the LVGL clock by the real elapsed time"""
+
+        now = time.ticks_ms()
+        elapsed = time.ticks_diff(now, self.last_tick)
+        if elapsed > 0:
+            lv.tick_inc(elapsed)
+            self.last_tick = now
+        return
+
+    def poll(self):
+        """poll, run LVGL once and return the ms until its next timer
+        deadline (NO_TIMER_READY when it is idle)"""
+
+        start = time.ticks_us()
+        self.tick()
+        wait = self.task_handler()
+        busy = time.ticks_diff(time.ticks_us(), start)
+
+        self.loops += 1
+        self.busy_us += busy
+        if busy > self.max_busy_us:
+            self.max_busy_us = busy
+        if wait == NO_TIMER_READY:
+            self.idle_loops += 1
+        return wait
+
+    def run(self, update=None, period_ms=0, loops=0):
+        """run, service LVGL forever (or for `loops` iterations), calling
+        update() every period_ms. update() may return False to stop."""
+
+        next_update = time.ticks_ms()
+        count = 0
+        while True:
+            if update is not None and time.ticks_diff(time.ticks_ms(), next_update) >= 0:
+                if update() is False:
+                    return
+                next_update = time.ticks_add(next_update, period_ms)
+                # fell behind by more than a period, don't try to catch up
+                if time.ticks_diff(time.ticks_ms(), next_update) > period_ms:
+                    next_update = time.ticks_ms()
+
+            wait = self.poll()
+
+            count += 1
+            if loops and count >= loops:
+                return
+
+            if wait == NO_TIMER_READY or wait > self.max_sleep_ms:
+                wait = self.max_sleep_ms
+            if update is not None:
+                wait = min(wait, time.ticks_diff(next_update, time.ticks_ms()))
+            if wait > 0:
+                time.sleep_ms(wait)
+                self.sleep_ms += wait
+
+    def run_fixed(self, step, period_ms, render=None, max_catchup=4, loops=0):
+        """run_fixed, call step() on a fixed timestep (see FixedStep,
+        kept as self.clock) and render(alpha) once per loop before LVGL
+        runs. step() may return False to stop."""
+
+        self.clock = clock = FixedStep(period_ms, max_catchup)
+        count = 0
+        while True:
+            for _ in range(clock.due()):
+                if step() is False:
+                    return
+            if render is not None:
+                render(clock.alpha())
+
+            wait = self.poll()
+
+            count += 1
+            if loops and count >= loops:
+                return
+
+            if wait == NO_TIMER_READY or wait > self.max_sleep_ms:
+                wait = self.max_sleep_ms
+            wait = min(wait, clock.wait_ms())
+            if wait > 0:
+                time.sleep_ms(wait)
+                self.sleep_ms += wait
+
+    def stats(self):
+        """stats, loop-time statistics since the last reset_stats()"""
+
+        elapsed = time.ticks_diff(time.ticks_ms(), self.stats_start)
+        loops = self.loops or 1
+        return {
+            'loops': self.loops,
+            'idle_loops': self.idle_loops,
+            'elapsed_ms': elapsed,
+            'avg_busy_us': self.busy_us // loops,
+            'max_busy_us': self.max_busy_us,
+            'sleep_ms': self.sleep_ms,
+            'cpu_pct': self.busy_us // 10 // (elapsed or 1),
+        }
+
+    def report(self):
+        """report, print the loop-time statistics"""
+
+        s = self.stats()
+        print('loops:', s['loops'], 'idle:', s['idle_loops'],
+              'busy avg/max us:', s['avg_busy_us'], s['max_busy_us'],
+              'cpu %:', s['cpu_pct'])
+        return
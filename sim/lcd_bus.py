@@ -0,0 +1,115 @@
+"""lcd_bus, host stand-in for the lvgl_micropython SPIBus.
+
+Nothing is sent anywhere; every byte is counted and the time the
+transfer would take on the wire at `freq` is accumulated, so demos and
+benchmarks can report SPI load without a board.
+
+Colour data is written into `ram`, a model of the panel's frame memory,
+at the CASET/RASET window in wire order (high byte first). Like the real
+bus, tx_color swaps the bytes of every pixel when the driver initialised
+it with rgb565_byte_swap, so data that was already swapped by the caller
+shows up with wrong colours in the sim's PNGs.
+"""
+
+MEMORY_32BIT = 0x02
+MEMORY_8BIT = 0x04
+MEMORY_DMA = 0x08
+MEMORY_SPIRAM = 0x400
+MEMORY_INTERNAL = 0x800
+MEMORY_DEFAULT = 0x1000
+
+# ST7735 frame memory is 132x162; MADCTL is not modelled, so the model
+# is square to hold the window of any rotation
+RAM_WIDTH = 162
+RAM_HEIGHT = 162
+
+_CASET = 0x2A
+_RASET = 0x2B
+
+
+class SPIBus:
+
+    # set by sim/run.py --freq to sweep the clock without editing demos
+    freq_override = 0
+
+    def __init__(self, spi_bus, freq, dc, cs=-1, **kwargs):
+        self.spi_bus = spi_bus
+        self.freq = SPIBus.freq_override or freq
+        self.dc = dc
+        self.cs = cs
+        self.callback = None
+        self.byte_swap = False
+        self.ram = bytearray(RAM_WIDTH * RAM_HEIGHT * 2)
+        self.window = [0, 0, RAM_WIDTH - 1, RAM_HEIGHT - 1]
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.param_bytes = 0
+        self.color_bytes = 0
+        self.transfers = 0
+        self.wire_us = 0
+
+    def _count(self, nbytes):
+        self.transfers += 1
+        self.wire_us += nbytes * 8 * 1000000 // self.freq
+
+    def init(self, width, height, bpp, buffer_size, rgb565_byte_swap, cmd_bits=8, param_bits=8):
+        self.width = width
+        self.height = height
+        self.bpp = bpp
+        self.byte_swap = rgb565_byte_swap
+
+    def allocate_framebuffer(self, size, caps):
+        return bytearray(size)
+
+    def free_framebuffer(self, buf):
+        pass
+
+    def register_callback(self, callback):
+        self.callback = callback
+
+    def tx_param(self, cmd, params=None):
+        n = 1 + (len(params) if params is not None else 0)
+        self.param_bytes += n
+        self._count(n)
+        if params is not None and len(params) == 4 and cmd in (_CASET, _RASET):
+            i = 0 if cmd == _CASET else 1
+            self.window[i] = (params[0] << 8) | params[1]
+            self.window[i + 2] = (params[2] << 8) | params[3]
+
+    def rx_param(self, cmd, params):
+        pass
+
+    def tx_color(self, cmd, data, x_start, y_start, x_end, y_end, rotation, last_update):
+        n = 1 + len(data)
+        self.color_bytes += n
+        self._count(n)
+        self._write_ram(data)
+        # real bus signals the end of the DMA transfer from an interrupt
+        if self.callback is not None:
+            self.callback(None, None)
+
+    def _write_ram(self, data):
+        # fill the window row by row, as the panel does after RAMWR
+        x1, y1, x2, y2 = self.window
+        ram = self.ram
+        hi = 1 if self.byte_swap else 0
+        x = x1
+        y = y1
+        for i in range(0, len(data) - 1, 2):
+            if x < RAM_WIDTH and y < RAM_HEIGHT:
+                o = (y * RAM_WIDTH + x) * 2
+                ram[o] = data[i + hi]
+                ram[o + 1] = data[i + 1 - hi]
+            x += 1
+            if x > x2:
+                x = x1
+                y += 1
+                if y > y2:
+                    y = y1
+
+    def get_lane_count(self):
+        return 1
+
+    def deinit(self):
+        pass
@@ -0,0 +1,195 @@
+"""machine, host stand-in for the parts of the ESP32 machine module
+used by the demos: Pin, SPI.Bus, SPI.Device, SoftSPI and Timer.
+
+Pins keep their level in memory; tests and replay scripts drive inputs
+with Pin.set_input(). SPI devices record what was written.
+"""
+
+import utime as time
+
+
+# set by sim/run.py --seconds: demos whose main loop only polls pins
+# (and never completes another frame) stop once this ticks_ms passes
+deadline_ms = 0
+
+
+def _check_deadline():
+    if deadline_ms and time.ticks_diff(time.ticks_ms(), deadline_ms) >= 0:
+        raise SystemExit
+
+
+def freq(hz=None):
+    return 160000000
+
+
+# irq handlers run synchronously from set_input(), nothing to mask
+def disable_irq():
+    return 0
+
+
+def enable_irq(state):
+    pass
+
+
+class Pin:
+
+    IN = 1
+    OUT = 3
+    OPEN_DRAIN = 7
+    PULL_UP = 1
+    PULL_DOWN = 2
+    IRQ_RISING = 1
+    IRQ_FALLING = 2
+
+    # every Pin created, by id, so scripts can poke inputs
+    pins = {}
+
+    def __init__(self, id, mode=-1, pull=-1, value=None):
+        self.id = id
+        self.mode = mode
+        self.pull = pull
+        self.handler = None
+        self.trigger = 0
+        # idle level follows the pull resistor like on the board
+        self.level = 1 if pull == Pin.PULL_UP else 0
+        if value is not None:
+            self.level = 1 if value else 0
+        Pin.pins[id] = self
+
+    def init(self, mode=-1, pull=-1, value=None):
+        self.__init__(self.id, mode, pull, value)
+
+    def value(self, v=None):
+        if v is None:
+            _check_deadline()
+            return self.level
+        self.level = 1 if v else 0
+
+    def on(self):
+        self.level = 1
+
+    def off(self):
+        self.level = 0
+
+    def irq(self, handler=None, trigger=IRQ_FALLING | IRQ_RISING):
+        self.handler = handler
+        self.trigger = trigger
+
+    def set_input(self, v):
+        """set_input, drive the pin from outside and fire its irq"""
+        v = 1 if v else 0
+        old = self.level
+        self.level = v
+        if self.handler is None or old == v:
+            return
+        if (v and self.trigger & Pin.IRQ_RISING) or (not v and self.trigger & Pin.IRQ_FALLING):
+            self.handler(self)
+
+    def __call__(self, v=None):
+        return self.value(v)
+
+
+class _Recorder:
+    """counts bytes written and keeps the last transfer"""
+
+    def __init__(self):
+        self.bytes_written = 0
+        self.transfers = 0
+        self.last = b''
+
+    def write(self, buf):
+        self.bytes_written += len(buf)
+        self.transfers += 1
+        self.last = bytes(buf)
+
+    def readinto(self, buf, write=0):
+        for i in range(len(buf)):
+            buf[i] = write
+
+    def write_readinto(self, wbuf, rbuf):
+        self.write(wbuf)
+        self.readinto(rbuf)
+
+
+class SPI:
+
+    MSB = 0
+    LSB = 1
+
+    class Bus:
+
+        def __init__(self, host, mosi, miso=-1, sck=-1, **kwargs):
+            self.host = host
+            self.mosi = mosi
+            self.miso = miso
+            self.sck = sck
+
+        def deinit(self):
+            pass
+
+    class Device(_Recorder):
+
+        def __init__(self, spi_bus, freq, cs=-1, polarity=0, phase=0, bits=8, firstbit=0, **kwargs):
+            super().__init__()
+            self.spi_bus = spi_bus
+            self.freq = freq
+            self.cs = cs
+            self.polarity = polarity
+            self.phase = phase
+
+        def deinit(self):
+            pass
+
+
+class SoftSPI(_Recorder):
+
+    MSB = 0
+    LSB = 1
+
+    def __init__(self, baudrate=500000, polarity=0, phase=0, bits=8, firstbit=0, sck=None, mosi=None, miso=None):
+        super().__init__()
+        self.baudrate = baudrate
+        self.polarity = polarity
+        self.phase = phase
+
+
+class Timer:
+    """Timer, callbacks are not run on their own; the host loop calls
+    Timer.run_due() to fire the ones whose period has elapsed"""
+
+    ONE_SHOT = 0
+    PERIODIC = 1
+
+    active = []
+
+    def __init__(self, id=0, **kwargs):
+        self.id = id
+        self.callback = None
+        if kwargs:
+            self.init(**kwargs)
+
+    def init(self, mode=PERIODIC, period=-1, freq=-1, callback=None):
+        if freq > 0:
+            period = 1000 // freq
+        self.mode = mode
+        self.period = max(period, 1)
+        self.callback = callback
+        self.due = time.ticks_add(time.ticks_ms(), self.period)
+        if self not in Timer.active:
+            Timer.active.append(self)
+
+    def deinit(self):
+        if self in Timer.active:
+            Timer.active.remove(self)
+
+    @staticmethod
+    def run_due():
+        _check_deadline()
+        now = time.ticks_ms()
+        for t in list(Timer.active):
+            while t in Timer.active and time.ticks_diff(now, t.due) >= 0:
+                if t.mode == Timer.ONE_SHOT:
+                    t.deinit()
+                else:
+                    t.due = time.ticks_add(t.due, t.period)
+                t.callback(t)
@@ -0,0 +1,20 @@
+"""micropython, CPython stand-in for const() and the code emitter
+decorators, which become no-ops so @viper/@native code runs as plain
+Python on the host.
+"""
+
+
+def const(x):
+    return x
+
+
+def native(f):
+    return f
+
+
+def viper(f):
+    return f
+
+
+def mem_info(*args):
+    pass
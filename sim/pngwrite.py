@@ -0,0 +1,82 @@
+"""pngwrite, minimal PNG encoder for RGB565 frames.
+
+Uses stored (uncompressed) deflate blocks so it needs nothing but
+binascii.crc32 and runs on CPython and the MicroPython unix port.
+"""
+
+import struct
+import binascii
+
+
+def _chunk(f, kind, data):
+    f.write(struct.pack('>I', len(data)))
+    f.write(kind)
+    f.write(data)
+    crc = binascii.crc32(data, binascii.crc32(kind))
+    f.write(struct.pack('>I', crc & 0xFFFFFFFF))
+
+
+def _adler32(data):
+    a = 1
+    b = 0
+    for i in range(0, len(data), 4096):
+        for c in data[i:i + 4096]:
+            a += c
+            b += a
+        a %= 65521
+        b %= 65521
+    return (b << 16) | a
+
+
+def _zlib_stored(raw):
+    out = bytearray(b'\x78\x01')
+    pos = 0
+    n = len(raw)
+    while True:
+        block = raw[pos:pos + 65535]
+        pos += len(block)
+        final = 1 if pos >= n else 0
+        out += struct.pack('<BHH', final, len(block), len(block) ^ 0xFFFF)
+        out += block
+        if final:
+            break
+    out += struct.pack('>I', _adler32(raw))
+    return out
+
+
+def rgb565_to_rgb888(fb, width, height, byte_swap=True):
+    """rgb565_to_rgb888, PNG scanlines (filter byte + RGB) from a
+    RGB565 buffer; byte_swap means the high byte comes first, as sent
+    to the panel with rgb565_byte_swap=True"""
+
+    raw = bytearray((width * 3 + 1) * height)
+    o = 0
+    i = 0
+    for y in range(height):
+        raw[o] = 0
+        o += 1
+        for x in range(width):
+            if byte_swap:
+                c = (fb[i] << 8) | fb[i + 1]
+            else:
+                c = fb[i] | (fb[i + 1] << 8)
+            i += 2
+            r = (c >> 11) & 0x1F
+            g = (c >> 5) & 0x3F
+            b = c & 0x1F
+            raw[o] = (r << 3) | (r >> 2)
+            raw[o + 1] = (g << 2) | (g >> 4)
+            raw[o + 2] = (b << 3) | (b >> 2)
+            o += 3
+    return raw
+
+
+def write_png(path, fb, width, height, byte_swap=True):
+    """write_png, save a RGB565 frame buffer as a 24 bit PNG"""
+
+    raw = rgb565_to_rgb888(fb, width, height, byte_swap)
+    with open(path, 'wb') as f:
+        f.write(b'\x89PNG\r\n\x1a\n')
+        _chunk(f, b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+        _chunk(f, b'IDAT', _zlib_stored(raw))
+        _chunk(f, b'IEND', b'')
@@ -0,0 +1,111 @@
+"""run, execute a demo headless on the host with the simulated display.
+
+    micropython sim/run.py basic/test.py --frames 100 --png /tmp/frames --freq 4000000
+    micropython sim/run.py functionGenerator/multimeter_c6.py --seconds 5
+
+Puts sim/ in front of the module search path so `machine`, `lcd_bus`
+and `st7735` resolve to the stand-ins (the lvgl module comes from the
+lvgl_micropython unix port), runs the demo from its own directory until
+--frames complete frames have been flushed (or --seconds have passed,
+for demos that sit in a pin polling loop without redrawing), then prints
+the frame and SPI counters. --freq overrides the SPI clock used for the
+wire time.
+
+On plain CPython the same stand-ins (plus utime, micropython, urandom)
+let the non-LVGL modules such as the AD9833 driver be exercised.
+"""
+
+import sys
+import os
+
+
+# MicroPython has no os.path, keep to plain string handling
+def _abspath(path):
+    if not path.startswith('/'):
+        path = os.getcwd() + '/' + path
+    return path
+
+
+def _dirname(path):
+    return path.rsplit('/', 1)[0] or '/'
+
+
+SIM_DIR = _dirname(_abspath(__file__))
+ROOT_DIR = _dirname(SIM_DIR)
+
+
+def setup():
+    """setup, make the stand-ins and the shared modules importable"""
+
+    for path in (ROOT_DIR, SIM_DIR):
+        if path in sys.path:
+            sys.path.remove(path)
+        sys.path.insert(0, path)
+    for name in ('machine', 'lcd_bus', 'st7735'):
+        if name in sys.modules:
+            del sys.modules[name]
+
+
+def main(argv):
+    if len(argv) < 2:
+        print('usage: run.py script.py [--frames N] [--seconds S] [--png DIR] [--every N] [--freq HZ]')
+        return 2
+
+    script = _abspath(argv[1])
+    frames = 100
+    png_dir = None
+    every = 1
+    freq = 0
+    seconds = 0
+    i = 2
+    while i < len(argv):
+        if argv[i] == '--frames':
+            frames = int(argv[i + 1])
+        elif argv[i] == '--png':
+            png_dir = _abspath(argv[i + 1])
+        elif argv[i] == '--every':
+            every = int(argv[i + 1])
+        elif argv[i] == '--freq':
+            freq = int(argv[i + 1])
+        elif argv[i] == '--seconds':
+            seconds = int(argv[i + 1])
+        i += 2
+
+    setup()
+    import st7735
+    import lcd_bus
+
+    st7735.ST7735.frame_limit = frames
+    st7735.ST7735.png_dir = png_dir
+    st7735.ST7735.png_every = every
+    if png_dir:
+        try:
+            os.mkdir(png_dir)
+        except OSError:
+            pass
+
+    # every SPIBus the demo creates uses this clock
+    lcd_bus.SPIBus.freq_override = freq
+
+    if seconds:
+        import machine
+        import utime
+        machine.deadline_ms = utime.ticks_add(utime.ticks_ms(), seconds * 1000)
+
+    # demos load assets (S:colorful.png ...) relative to where they live
+    os.chdir(_dirname(script))
+    sys.path.insert(0, _dirname(script))
+    with open(script) as f:
+        code = f.read()
+    try:
+        exec(code, {'__name__': '__main__', '__file__': script})
+    except SystemExit:
+        pass
+
+    for display in st7735.ST7735.instances:
+        print(display.stats())
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -0,0 +1,162 @@
+"""st7735, host stand-in for the lvgl_micropython ST7735 driver.
+
+Creates a real LVGL display (unix port) whose flush path sends every
+flushed area through the simulated lcd_bus, so SPI bytes and wire time at
+_LCD_FREQ are accounted exactly like on the board, and the PNGs show the
+bus's model of the panel memory, byte swap included.
+
+Class attributes set by sim/run.py:
+    frame_limit  - raise SystemExit after this many complete frames (0 = never)
+    png_dir      - write frame_NNNNN.png here every png_every frames
+"""
+
+import lvgl as lv
+
+STATE_HIGH = 1
+STATE_LOW = 0
+STATE_PWM = -1
+
+BYTE_ORDER_RGB = 0x00
+BYTE_ORDER_BGR = 0x08
+
+TYPE_B = 0
+TYPE_R_RED = 1
+TYPE_R_GREEN = 2
+TYPE_R_BLACK = 3
+
+_CASET = 0x2A
+_RASET = 0x2B
+_RAMWR = 0x2C
+_INVON = 0x21
+_INVOFF = 0x20
+
+
+class ST7735:
+
+    frame_limit = 0
+    png_dir = None
+    png_every = 1
+    instances = []
+
+    def __init__(self, data_bus, display_width, display_height, frame_buffer1=None, frame_buffer2=None,
+                 reset_pin=None, reset_state=STATE_HIGH, power_pin=None, power_on_state=STATE_HIGH,
+                 backlight_pin=None, backlight_on_state=STATE_HIGH, offset_x=0, offset_y=0,
+                 color_byte_order=BYTE_ORDER_RGB, color_space=lv.COLOR_FORMAT.RGB565,
+                 rgb565_byte_swap=False):
+
+        self._data_bus = data_bus
+        self._offset_x = offset_x
+        self._offset_y = offset_y
+        self._rotation = lv.DISPLAY_ROTATION._0
+        self._rgb565_byte_swap = rgb565_byte_swap
+        self.display_width = display_width
+        self.display_height = display_height
+        self.backlight = 0
+        self.inverted = False
+        self.panel_type = None
+
+        if frame_buffer1 is None:
+            size = display_width * display_height * 2 // 10
+            frame_buffer1 = data_bus.allocate_framebuffer(size, 0)
+        self._frame_buffer1 = frame_buffer1
+        self._frame_buffer2 = frame_buffer2
+
+        data_bus.init(display_width, display_height, 16, len(frame_buffer1), rgb565_byte_swap)
+
+        self.width = display_width
+        self.height = display_height
+        self.frames = 0
+        self.flushes = 0
+        self.flushed_pixels = 0
+
+        self._disp_drv = lv.display_create(display_width, display_height)
+        self._disp_drv.set_color_format(color_space)
+        self._disp_drv.set_flush_cb(self._flush_cb)
+        self._disp_drv.set_buffers(frame_buffer1, frame_buffer2, len(frame_buffer1),
+                                   lv.DISPLAY_RENDER_MODE.PARTIAL)
+        data_bus.register_callback(self._flush_ready_cb)
+        ST7735.instances.append(self)
+
+    def init(self, type=None):
+        self.panel_type = type
+
+    def set_rotation(self, value):
+        self._rotation = value
+        self._disp_drv.set_rotation(value)
+        self.width = self._disp_drv.get_horizontal_resolution()
+        self.height = self._disp_drv.get_vertical_resolution()
+
+    def get_rotation(self):
+        return self._rotation
+
+    def set_backlight(self, value):
+        self.backlight = value
+
+    def get_backlight(self):
+        return self.backlight
+
+    def set_power(self, value):
+        pass
+
+    def set_color_inversion(self, value):
+        self.inverted = value
+        self._data_bus.tx_param(_INVON if value else _INVOFF)
+
+    def _set_memory_location(self, x1, y1, x2, y2):
+        self._data_bus.tx_param(_CASET, bytearray([x1 >> 8, x1 & 0xFF, x2 >> 8, x2 & 0xFF]))
+        self._data_bus.tx_param(_RASET, bytearray([y1 >> 8, y1 & 0xFF, y2 >> 8, y2 & 0xFF]))
+        return _RAMWR
+
+    def _flush_ready_cb(self, *args):
+        self._disp_drv.flush_ready()
+
+    def _flush_cb(self, disp, area, color_p):
+        x1 = area.x1
+        y1 = area.y1
+        w = area.x2 - x1 + 1
+        h = area.y2 - y1 + 1
+        size = w * h * 2
+        data = color_p.__dereference__(size)
+
+        self.flushes += 1
+        self.flushed_pixels += w * h
+
+        cmd = self._set_memory_location(x1 + self._offset_x, y1 + self._offset_y,
+                                        area.x2 + self._offset_x, area.y2 + self._offset_y)
+        last = disp.flush_is_last()
+        self._data_bus.tx_color(cmd, data, x1, y1, area.x2, area.y2, self._rotation, last)
+
+        if last:
+            self._frame_done()
+
+    def _frame_done(self):
+        self.frames += 1
+        if ST7735.png_dir and self.frames % ST7735.png_every == 0:
+            self.save_png('%s/frame_%05d.png' % (ST7735.png_dir, self.frames))
+        if ST7735.frame_limit and self.frames >= ST7735.frame_limit:
+            raise SystemExit
+
+    def save_png(self, path):
+        """save_png, dump the visible part of the panel memory"""
+        import pngwrite
+        import lcd_bus
+        ram = self._data_bus.ram
+        row = self.width * 2
+        fb = bytearray(row * self.height)
+        for y in range(self.height):
+            o = ((y + self._offset_y) * lcd_bus.RAM_WIDTH + self._offset_x) * 2
+            fb[y * row:(y + 1) * row] = ram[o:o + row]
+        pngwrite.write_png(path, fb, self.width, self.height, byte_swap=True)
+
+    def stats(self):
+        """stats, frame and SPI counters for this display"""
+        bus = self._data_bus
+        return {
+            'frames': self.frames,
+            'flushes': self.flushes,
+            'flushed_pixels': self.flushed_pixels,
+            'spi_bytes': bus.param_bytes + bus.color_bytes,
+            'spi_transfers': bus.transfers,
+            'spi_wire_ms': bus.wire_us // 1000,
+            'spi_freq': bus.freq,
+        }
@@ -0,0 +1,3 @@
+"""urandom, CPython stand-in for the MicroPython random module."""
+
+from random import *  # noqa: F401,F403
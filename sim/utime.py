@@ -0,0 +1,47 @@
+"""utime, CPython stand-in for the MicroPython time functions.
+
+Only picked up on CPython; MicroPython uses its built-in module.
+"""
+
+import time as _time
+
+_TICKS_PERIOD = 1 << 30
+_TICKS_HALF = _TICKS_PERIOD // 2
+
+
+def ticks_ms():
+    return int(_time.monotonic() * 1000) & (_TICKS_PERIOD - 1)
+
+
+def ticks_us():
+    return int(_time.monotonic() * 1000000) & (_TICKS_PERIOD - 1)
+
+
+def ticks_cpu():
+    return ticks_us()
+
+
+def ticks_add(ticks, delta):
+    return (ticks + delta) & (_TICKS_PERIOD - 1)
+
+
+def ticks_diff(end, start):
+    return ((end - start + _TICKS_HALF) & (_TICKS_PERIOD - 1)) - _TICKS_HALF
+
+
+def sleep(s):
+    _time.sleep(s)
+
+
+def sleep_ms(ms):
+    if ms > 0:
+        _time.sleep(ms / 1000)
+
+
+def sleep_us(us):
+    if us > 0:
+        _time.sleep(us / 1000000)
+
+
+def time():
+    return int(_time.time())
@@ -0,0 +1,167 @@
+"""autoplay, the snake plays itself (attract mode and soak test)
+
+AutoPlayer plans a shortest path from the head to the food with a BFS
+over the engine's occupancy grid and keeps it. Each step only checks
+that the next cell of the cached path is still free; the path is
+recomputed when new food spawns or the cached path is blocked. When the
+food cannot be reached it takes the safe neighbour with the most room
+around it, so it stalls for time instead of dying.
+
+    player = AutoPlayer(game)
+    game.step(player.turn())
+
+All buffers are preallocated bytearrays, a plan is one BFS over the 224
+cells, well inside the 80 ms step on the C6.
+"""
+
+from engine import DIRS
+
+
+class AutoPlayer:
+
+    def __init__(self, game):
+        self.game = game
+        n = game.n_cells
+        self.queue = bytearray(n) if n <= 256 else [0] * n
+        self.parent = bytearray(n) if n <= 256 else [0] * n
+        # seen[i] == stamp marks cells visited by the current search
+        self.seen = bytearray(n)
+        self.stamp = 0
+        # cached path, head excluded, path[pos] is the next cell
+        self.path = bytearray(n) if n <= 256 else [0] * n
+        self.path_len = 0
+        self.pos = 0
+        self.target = -1
+        self.plans = 0
+        self.hits = 0
+        return
+
+    def _next_stamp(self):
+        self.stamp += 1
+        if self.stamp == 256:
+            for i in range(len(self.seen)):
+                self.seen[i] = 0
+            self.stamp = 1
+        return self.stamp
+
+    def _free(self, i, tail):
+        return not self.game.grid[i] or i == tail
+
+    def _neighbours(self, i):
+        game = self.game
+        cols = game.cols
+        c = i % cols
+        r = i // cols
+        if r > 0:
+            yield i - cols
+        if c < cols - 1:
+            yield i + 1
+        if r < game.rows - 1:
+            yield i + cols
+        if c > 0:
+            yield i - 1
+
+    def _bfs(self, start, goal, tail):
+        """_bfs, shortest path start -> goal into self.path, or False"""
+
+        stamp = self._next_stamp()
+        seen = self.seen
+        queue = self.queue
+        parent = self.parent
+        seen[start] = stamp
+        queue[0] = start
+        head = 0
+        end = 1
+        while head < end:
+            i = queue[head]
+            head += 1
+            if i == goal:
+                # walk the parents back to start
+                n = 0
+                while i != start:
+                    n += 1
+                    i = parent[i]
+                i = goal
+                for k in range(n - 1, -1, -1):
+                    self.path[k] = i
+                    i = parent[i]
+                self.path_len = n
+                self.pos = 0
+                return True
+            for j in self._neighbours(i):
+                if seen[j] != stamp and self._free(j, tail):
+                    seen[j] = stamp
+                    parent[j] = i
+                    queue[end] = j
+                    end += 1
+        return False
+
+    def _room(self, start, tail):
+        """_room, cells reachable from start, capped at the snake length"""
+
+        stamp = self._next_stamp()
+        seen = self.seen
+        queue = self.queue
+        seen[start] = stamp
+        queue[0] = start
+        head = 0
+        end = 1
+        cap = self.game.length + 1
+        while head < end and end < cap:
+            i = queue[head]
+            head += 1
+            for j in self._neighbours(i):
+                if seen[j] != stamp and self._free(j, tail):
+                    seen[j] = stamp
+                    queue[end] = j
+                    end += 1
+        return end
+
+    def _turn_to(self, cell):
+        game = self.game
+        h = game.body[game.head_pos]
+        cols = game.cols
+        dx = cell % cols - h % cols
+        dy = cell // cols - h // cols
+        for d in range(4):
+            if DIRS[d] == (dx, dy):
+                return (d - game.direction) % 4
+        return 0
+
+    def turn(self):
+        """turn, the turn to give to the next game.step()"""
+
+        game = self.game
+        if game.over:
+            return 1
+        h = game.body[game.head_pos]
+        tail = game.tail()
+
+        if game.food != self.target or self.pos >= self.path_len or \
+                not self._free(self.path[self.pos], tail):
+            self.target = game.food
+            self.plans += 1
+            if game.food < 0 or not self._bfs(h, game.food, tail):
+                self.path_len = 0
+        else:
+            self.hits += 1
+
+        if self.pos < self.path_len:
+            cell = self.path[self.pos]
+            self.pos += 1
+            return self._turn_to(cell)
+
+        # no way to the food: the safe neighbour with the most room
+        best = -1
+        best_room = -1
+        for j in self._neighbours(h):
+            if self._free(j, tail):
+                room = self._room(j, tail)
+                if room > best_room:
+                    best = j
+                    best_room = room
+        # replan next step, the food may be reachable by then
+        self.target = -1
+        if best < 0:
+            return 0
+        return self._turn_to(best)
@@ -0,0 +1,268 @@
+"""engine, headless snake game logic
+
+No LVGL, no pins, no globals: the board (snake/snake.py) and the host
+runner (snake/replay.py) drive the same SnakeEngine, so the game can be
+profiled off the board and a recorded session replays bit exactly.
+
+    game = SnakeEngine(seed=1234)
+    result = game.step(TURN_NONE)      # MOVED, ATE, DIED or RESTARTED
+    game.head, game.cleared, game.food # cells to redraw, r * cols + c
+
+Turns are relative to the current direction, added modulo 4. Stepping a
+finished game starts the next one, the RNG carries on, so a whole
+session is one seed and one turn per step. Replay records exactly that,
+two bits per step.
+"""
+
+import struct
+from array import array
+
+TURN_NONE = 0
+TURN_RIGHT = 1
+TURN_LEFT = 3
+
+MOVED = 0
+ATE = 1
+DIED = 2
+RESTARTED = 3
+
+# up, right, down, left
+DIRS = ((0, -1), (1, 0), (0, 1), (-1, 0))
+
+_MASK32 = 0xFFFFFFFF
+
+
+def _cells(n):
+    # cell numbers fit a byte on the 16x14 board
+    if n <= 256:
+        return bytearray(n)
+    return array('H', [0] * n)
+
+
+class SnakeEngine:
+
+    def __init__(self, cols=16, rows=14, seed=1):
+        """__init__, board size in cells and the RNG seed (non zero)"""
+
+        self.cols = cols
+        self.rows = rows
+        self.n_cells = cols * rows
+        # grid marks the snake, body is a ring buffer of its cells with
+        # the head at body[head_pos]
+        self.grid = bytearray(self.n_cells)
+        self.body = _cells(self.n_cells)
+        # free[:n_free] are the cells off the snake, where[i] is the
+        # position of cell i in free, swap-removed for O(1) updates
+        self.free = _cells(self.n_cells)
+        self.where = _cells(self.n_cells)
+        self.seed = seed & _MASK32 or 1
+        self.rng = self.seed
+        self.steps = 0
+        self.games = 0
+        self.reset()
+        return
+
+    def rand(self):
+        """rand, next 32 bit xorshift value, the same on every port"""
+
+        x = self.rng
+        x ^= (x << 13) & _MASK32
+        x ^= x >> 17
+        x ^= (x << 5) & _MASK32
+        self.rng = x
+        return x
+
+    def randbelow(self, n):
+        """randbelow, uniform in range(n), rejection keeps it unbiased"""
+
+        limit = 0x100000000 - 0x100000000 % n
+        while True:
+            x = self.rand()
+            if x < limit:
+                return x % n
+
+    def reset(self):
+        """reset, new game: three cells in the middle heading right"""
+
+        for i in range(self.n_cells):
+            self.grid[i] = 0
+            self.free[i] = i
+            self.where[i] = i
+        self.n_free = self.n_cells
+        self.head_pos = 0
+        self.length = 0
+        self.direction = 1
+        self.score = 0
+        self.over = False
+        self.food = -1
+        self.cleared = -1
+        r = self.rows // 2
+        c = self.cols // 2
+        for i in (c - 2, c - 1, c):
+            self._push_head(r * self.cols + i)
+        self.head = r * self.cols + c
+        self._spawn_food()
+        self.games += 1
+        return
+
+    def _take_free(self, i):
+        self.n_free -= 1
+        p = self.where[i]
+        last = self.free[self.n_free]
+        self.free[p] = last
+        self.where[last] = p
+
+    def _give_free(self, i):
+        self.free[self.n_free] = i
+        self.where[i] = self.n_free
+        self.n_free += 1
+
+    def _push_head(self, i):
+        self.head_pos = (self.head_pos + 1) % self.n_cells
+        self.body[self.head_pos] = i
+        self.grid[i] = 1
+        self.length += 1
+        self._take_free(i)
+
+    def tail(self):
+        """tail, cell of the last body segment"""
+
+        return self.body[(self.head_pos - self.length + 1) % self.n_cells]
+
+    def _pop_tail(self):
+        i = self.tail()
+        self.grid[i] = 0
+        self.length -= 1
+        self._give_free(i)
+        return i
+
+    def _spawn_food(self):
+        if self.n_free:
+            self.food = self.free[self.randbelow(self.n_free)]
+        else:
+            self.food = -1
+
+    def cells(self):
+        """cells, the snake from tail to head"""
+
+        n = self.n_cells
+        for k in range(self.length - 1, -1, -1):
+            yield self.body[(self.head_pos - k) % n]
+
+    def step(self, turn=TURN_NONE):
+        """step, turn then move one cell; returns MOVED, ATE or DIED, or
+        RESTARTED when called on a finished game"""
+
+        self.steps += 1
+        self.cleared = -1
+        if self.over:
+            self.reset()
+            return RESTARTED
+
+        self.direction = (self.direction + turn) % 4
+        cols = self.cols
+        h = self.body[self.head_pos]
+        dx, dy = DIRS[self.direction]
+        nc = h % cols + dx
+        nr = h // cols + dy
+        if nc < 0 or nc >= cols or nr < 0 or nr >= self.rows:
+            self.over = True
+            return DIED
+        n = nr * cols + nc
+        # the tail moves out of the way this step, running into it is fine
+        if self.grid[n] and n != self.tail():
+            self.over = True
+            return DIED
+
+        ate = n == self.food
+        if not ate:
+            self.cleared = self._pop_tail()
+        self._push_head(n)
+        self.head = n
+        if ate:
+            self.score += 1
+            self._spawn_food()
+            return ATE
+        return MOVED
+
+    def digest(self):
+        """digest, 32 bit FNV-1a over the game state, equal digests mean
+        a replay ended exactly where the recording did"""
+
+        h = 0x811C9DC5
+        for v in self.cells():
+            h = ((h ^ v) * 0x01000193) & _MASK32
+        for v in (self.food & 0xFFFF, self.direction, self.score & 0xFFFF,
+                  self.games & 0xFFFF, self.rng & 0xFFFF, self.rng >> 16):
+            h = ((h ^ v) * 0x01000193) & _MASK32
+        return h
+
+
+class Replay:
+    """turn log of a session, two bits per step
+
+    file: b'SNK', version, cols, rows, seed, steps, digest (little
+    endian), then the turns packed four to a byte, first step in the low
+    bits"""
+
+    HEADER = '<3sBBBIII'
+    MAGIC = b'SNK'
+    VERSION = 1
+
+    def __init__(self, cols=16, rows=14, seed=1):
+        self.cols = cols
+        self.rows = rows
+        self.seed = seed
+        self.steps = 0
+        self.digest = 0
+        self.data = bytearray()
+        return
+
+    def add(self, turn):
+        """add, record the turn given to one step"""
+
+        i = self.steps & 3
+        if i == 0:
+            self.data.append(0)
+        self.data[-1] |= (turn & 3) << (i * 2)
+        self.steps += 1
+        return
+
+    def turn(self, i):
+        """turn, turn given to step i"""
+
+        return (self.data[i >> 2] >> ((i & 3) * 2)) & 3
+
+    def save(self, path, digest=0):
+        """save, write the log, digest is SnakeEngine.digest() at the end"""
+
+        self.digest = digest
+        with open(path, 'wb') as f:
+            f.write(struct.pack(self.HEADER, self.MAGIC, self.VERSION, self.cols,
+                                self.rows, self.seed, self.steps, digest))
+            f.write(self.data)
+        return
+
+    @classmethod
+    def load(cls, path):
+        """load, read a log written by save()"""
+
+        size = struct.calcsize(cls.HEADER)
+        with open(path, 'rb') as f:
+            magic, version, cols, rows, seed, steps, digest = struct.unpack(cls.HEADER, f.read(size))
+            if magic != cls.MAGIC or version != cls.VERSION:
+                raise ValueError('not a snake replay: %s' % path)
+            log = cls(cols, rows, seed)
+            log.data = bytearray(f.read())
+        log.steps = steps
+        log.digest = digest
+        return log
+
+    def play(self, game=None):
+        """play, run the log on a fresh engine and return it"""
+
+        if game is None:
+            game = SnakeEngine(self.cols, self.rows, self.seed)
+        for i in range(self.steps):
+            game.step(self.turn(i))
+        return game
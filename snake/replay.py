@@ -0,0 +1,103 @@
+"""replay, run the snake engine on the host (or the board) without a display
+
+    python3 snake/replay.py --steps 1000000             # timed random play
+    python3 snake/replay.py --steps 100000 --record s.snk
+    python3 snake/replay.py s.snk                       # replay and verify
+    python3 snake/replay.py --steps 100000 --auto       # autoplayer, with planning cost
+    micropython snake/replay.py --steps 1000000
+
+Random play turns with a probability of 1/8 per step from its own
+xorshift, so runs are repeatable for a given --seed. Replaying checks the
+final engine digest against the one stored with the recording (snake.py
+writes snake.snk with RECORD = True).
+"""
+
+import sys
+
+try:
+    import utime as time
+except ImportError:
+    # CPython: use the shim from the host simulator
+    sys.path.append((__file__.rsplit('/', 1)[0] if '/' in __file__ else '.') + '/../sim')
+    import utime as time
+
+import engine
+import autoplay
+
+
+def random_play(steps, seed, record=None, auto=False):
+    game = engine.SnakeEngine(seed=seed)
+    log = engine.Replay(game.cols, game.rows, game.seed) if record else None
+    player = autoplay.AutoPlayer(game) if auto else None
+    x = seed ^ 0x5EED or 1
+    turns = (engine.TURN_LEFT, engine.TURN_RIGHT)
+    best = 0
+    start = time.ticks_us()
+    for _ in range(steps):
+        if player is not None:
+            turn = player.turn()
+        else:
+            x ^= (x << 13) & 0xFFFFFFFF
+            x ^= x >> 17
+            x ^= (x << 5) & 0xFFFFFFFF
+            turn = turns[(x >> 8) & 1] if x & 7 == 0 else engine.TURN_NONE
+        if game.step(turn) == engine.DIED and game.score > best:
+            best = game.score
+        if log is not None:
+            log.add(turn)
+    elapsed = time.ticks_diff(time.ticks_us(), start)
+    if log is not None:
+        log.save(record, game.digest())
+    if player is not None:
+        print('best score %d, %d plans, %d cached steps' % (best, player.plans, player.hits))
+    return game, elapsed
+
+
+def report(game, elapsed):
+    print('steps %d games %d score %d digest %08x' % (game.steps, game.games, game.score, game.digest()))
+    print('%d us total, %.3f us/step' % (elapsed, elapsed / max(1, game.steps)))
+
+
+def main(argv):
+    steps = 1000000
+    seed = 1
+    record = None
+    auto = False
+    path = None
+    i = 0
+    while i < len(argv):
+        if argv[i] == '--steps':
+            steps = int(argv[i + 1])
+            i += 2
+        elif argv[i] == '--seed':
+            seed = int(argv[i + 1])
+            i += 2
+        elif argv[i] == '--auto':
+            auto = True
+            i += 1
+        elif argv[i] == '--record':
+            record = argv[i + 1]
+            i += 2
+        else:
+            path = argv[i]
+            i += 1
+
+    if path is None:
+        game, elapsed = random_play(steps, seed, record, auto)
+        report(game, elapsed)
+        return 0
+
+    log = engine.Replay.load(path)
+    start = time.ticks_us()
+    game = log.play()
+    elapsed = time.ticks_diff(time.ticks_us(), start)
+    report(game, elapsed)
+    if game.digest() != log.digest:
+        print('MISMATCH: recorded digest %08x' % log.digest)
+        return 1
+    print('replay matches')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
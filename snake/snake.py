@@ -1,57 +1,71 @@
-import lcd_bus
+import lcd
 import machine
-import st7735
 import lvgl as lv
-import urandom
 import utime as time
-
-lv.init()
-
-# ── Display settings ──
-_WIDTH = 128
-_HEIGHT = 128
-_BL = 19
-_RST = 14
-_DC = 15
- 
-_MOSI = 21 #SDA
-_MISO = 20
-_SCK = 22  # SCL
-_HOST = 1  # SPI2
- 
-_LCD_CS = 18
-_LCD_FREQ = 2000000
- 
-_OFFSET_X = 2
-_OFFSET_Y = 3
+import engine
+from fastpath import blit_rows
 
 BUTTON1 = 1
 BUTTON2 = 2
 
-spi_bus = machine.SPI.Bus(host=_HOST, mosi=_MOSI, sck=_SCK)
-display_bus = lcd_bus.SPIBus(spi_bus=spi_bus, freq=_LCD_FREQ, dc=_DC, cs=_LCD_CS)
-display = st7735.ST7735(
-    data_bus=display_bus,
-    display_width=_WIDTH,
-    display_height=_HEIGHT,
-    backlight_pin=_BL,
-    reset_pin=_RST,
-    reset_state=st7735.STATE_LOW,
-    backlight_on_state=st7735.STATE_HIGH,
-    color_space=lv.COLOR_FORMAT.RGB565,
-    color_byte_order=st7735.BYTE_ORDER_BGR,
-    rgb565_byte_swap=True,
-    offset_x=_OFFSET_X,
-    offset_y=_OFFSET_Y,
-)
-display.init(st7735.TYPE_R_RED)
-display.set_rotation(lv.DISPLAY_ROTATION._180)
-display.set_backlight(100)
+# time cell drawing (set_px versus tile blit) at start up
+BENCHMARK = False
+# keep a replay of the session, saved to snake.snk at every game over;
+# check it on the PC with: python3 snake/replay.py snake.snk
+RECORD = False
+# attract mode: the snake plays itself and restarts, also a CPU and
+# display soak test
+AUTOPLAY = False
+
+display = lcd.create('c6_128x128')
 
 # ── Buttons ──
 btn_left = machine.Pin(BUTTON1, machine.Pin.IN, machine.Pin.PULL_DOWN)
 btn_right = machine.Pin(BUTTON2, machine.Pin.IN, machine.Pin.PULL_DOWN)
 
+# Presses are caught by the pin interrupt, so a tap between two polls or
+# during a long redraw still counts, and queued so two quick taps make
+# two turns. Each game step takes one turn off the queue. Both edges
+# interrupt: every edge restarts the button's quiet time, and a press
+# only counts when the line was quiet for DEBOUNCE_MS before a rising
+# edge, so the bounce of a release never becomes a second turn.
+DEBOUNCE_MS = 40
+turns = bytearray(4)
+turn_first = 0
+turn_count = 0
+last_edge = [0, 0]
+
+def queue_turn(button, turn, level):
+    # runs in the interrupt, no allocation
+    global turn_count
+    now = time.ticks_ms()
+    quiet = time.ticks_diff(now, last_edge[button]) >= DEBOUNCE_MS
+    last_edge[button] = now
+    if not quiet or not level:
+        return
+    if turn_count < len(turns):
+        turns[(turn_first + turn_count) % len(turns)] = turn
+        turn_count += 1
+
+def next_turn():
+    global turn_first, turn_count
+    if not turn_count:
+        return 0
+    irq = machine.disable_irq()
+    turn = turns[turn_first]
+    turn_first = (turn_first + 1) % len(turns)
+    turn_count -= 1
+    machine.enable_irq(irq)
+    return turn
+
+def clear_turns():
+    global turn_count
+    turn_count = 0
+
+EDGES = machine.Pin.IRQ_RISING | machine.Pin.IRQ_FALLING
+btn_left.irq(lambda pin: queue_turn(0, engine.TURN_LEFT, pin.value()), EDGES)
+btn_right.irq(lambda pin: queue_turn(1, engine.TURN_RIGHT, pin.value()), EDGES)
+
 # ── Game constants ──
 CELL = 8
 COLS = 16
@@ -63,8 +77,6 @@ CLR_BG = lv.color_hex(0x9BBC0F)
 CLR_SNAKE = lv.color_hex(0x306230)
 CLR_FOOD = lv.color_hex(0x0F380F)
 
-DIRS = [(0, -1), (1, 0), (0, 1), (-1, 0)]
-
 # ── Screen ──
 scrn = lv.screen_active()
 scrn.set_style_bg_color(lv.color_hex(0x9BBC0F), 0)
@@ -85,124 +97,165 @@ canvas.set_buffer(cbuf, CANVAS_W, CANVAS_H, lv.COLOR_FORMAT.RGB565)
 canvas.set_pos(0, SCORE_H)
 canvas.fill_bg(CLR_BG, lv.OPA.COVER)
 
-def draw_cell(col, row, color):
+# One row of a cell in canvas RGB565 (native little endian), a cell is
+# drawn by copying it into the CELL rows of cbuf, no LVGL calls
+def make_tile(rgb):
+    c = ((rgb >> 8) & 0xF800) | ((rgb >> 5) & 0x07E0) | ((rgb & 0xFF) >> 3)
+    return bytes([c & 0xFF, c >> 8] * CELL)
+
+TILE_BG = make_tile(0x9BBC0F)
+TILE_SNAKE = make_tile(0x306230)
+TILE_FOOD = make_tile(0x0F380F)
+
+ROW_BYTES = CANVAS_W * 2
+TILE_BYTES = CELL * 2
+
+def draw_cell(col, row, tile):
+    # viper compiled when the firmware supports it, see fastpath.py
+    blit_rows(cbuf, row * CELL * ROW_BYTES + col * TILE_BYTES, ROW_BYTES, tile, CELL)
+
+def clear_cell(col, row):
+    draw_cell(col, row, TILE_BG)
+
+# Only the changed cells are redrawn and sent, 128 bytes each instead of
+# the 28 KB canvas. invalidate_area takes screen coordinates, the canvas
+# sits at (0, SCORE_H) on the unpadded screen.
+dirty = lv.area_t()
+
+def invalidate_cell(col, row):
+    dirty.x1 = col * CELL
+    dirty.y1 = SCORE_H + row * CELL
+    dirty.x2 = dirty.x1 + CELL - 1
+    dirty.y2 = dirty.y1 + CELL - 1
+    canvas.invalidate_area(dirty)
+
+# the old per pixel drawing, kept for the benchmark
+def draw_cell_set_px(col, row, color):
     x0 = col * CELL
     y0 = row * CELL
     for y in range(y0, y0 + CELL):
         for x in range(x0, x0 + CELL):
             canvas.set_px(x, y, color, lv.OPA.COVER)
 
-def clear_cell(col, row):
-    draw_cell(col, row, CLR_BG)
-
 # ── Game state ──
-snake = []
-food = None
-direction = 1
-score = 0
-game_over = False
-
-def spawn_food():
-    global food
-    free = []
-    for c in range(COLS):
-        for r in range(ROWS):
-            if (c, r) not in snake:
-                free.append((c, r))
-    if not free:
-        return
-    food = free[urandom.getrandbits(8) % len(free)]
-    draw_cell(food[0], food[1], CLR_FOOD)
+# The rules live in engine.py (cells are numbered r * COLS + c); this file
+# only draws what a step changed.
+game = engine.SnakeEngine(COLS, ROWS, seed=time.ticks_us() | 1)
+log = engine.Replay(COLS, ROWS, game.seed) if RECORD else None
+player = None
+if AUTOPLAY:
+    import autoplay
+    player = autoplay.AutoPlayer(game)
+
+def draw_game_cell(i, tile):
+    draw_cell(i % COLS, i // COLS, tile)
+    invalidate_cell(i % COLS, i // COLS)
 
 def update_score():
-    score_lbl.set_text('Score: ' + str(score))
+    score_lbl.set_text('Score: ' + str(game.score))
 
 def init_game():
-    global snake, food, direction, score, game_over
     canvas.fill_bg(CLR_BG, lv.OPA.COVER)
-    snake = [(8, 7), (7, 7), (6, 7)]
-    food = None
-    direction = 1
-    score = 0
-    game_over = False
-    for c, r in snake:
-        draw_cell(c, r, CLR_SNAKE)
-    spawn_food()
+    for i in game.cells():
+        draw_cell(i % COLS, i // COLS, TILE_SNAKE)
+    if game.food >= 0:
+        draw_cell(game.food % COLS, game.food // COLS, TILE_FOOD)
     update_score()
     canvas.invalidate()
 
-def step():
-    global game_over, score
-    hc, hr = snake[0]
-    dx, dy = DIRS[direction]
-    nc, nr = hc + dx, hr + dy
+def step(turn):
+    result = game.step(turn)
+    if log is not None:
+        log.add(turn)
+    if result == engine.RESTARTED:
+        init_game()
+    elif result != engine.DIED:
+        if game.cleared >= 0:
+            draw_game_cell(game.cleared, TILE_BG)
+        draw_game_cell(game.head, TILE_SNAKE)
+        if result == engine.ATE:
+            update_score()
+            if game.food >= 0:
+                draw_game_cell(game.food, TILE_FOOD)
+    return result
 
-    if nc < 0 or nc >= COLS or nr < 0 or nr >= ROWS:
-        game_over = True
-        return
-    if (nc, nr) in snake[:-1]:
-        game_over = True
-        return
+def show_game_over():
+    score_lbl.set_text('GAME OVER: ' + str(game.score))
+    if log is not None:
+        log.save('snake.snk', game.digest())
 
-    ate = (nc, nr) == food
-    snake.insert(0, (nc, nr))
-    draw_cell(nc, nr, CLR_SNAKE)
+def benchmark(n=224):
+    cells = [(i % COLS, (i // COLS) % ROWS) for i in range(n)]
 
-    if ate:
-        score += 1
-        update_score()
-        spawn_food()
-    else:
-        tc, tr = snake.pop()
-        clear_cell(tc, tr)
+    t = time.ticks_us()
+    for c, r in cells:
+        draw_cell_set_px(c, r, CLR_SNAKE)
+    before = time.ticks_diff(time.ticks_us(), t)
+
+    t = time.ticks_us()
+    for c, r in cells:
+        draw_cell(c, r, TILE_SNAKE)
+    after = time.ticks_diff(time.ticks_us(), t)
+
+    t = time.ticks_us()
+    init_game()
+    init_us = time.ticks_diff(time.ticks_us(), t)
+    lv.refr_now(None)
+
+    # redraw and flush of one step: whole canvas versus the two cells
+    t = time.ticks_us()
     canvas.invalidate()
+    lv.refr_now(None)
+    full_us = time.ticks_diff(time.ticks_us(), t)
 
-def show_game_over():
-    score_lbl.set_text('GAME OVER: ' + str(score))
+    t = time.ticks_us()
+    invalidate_cell(0, 0)
+    invalidate_cell(COLS - 1, ROWS - 1)
+    lv.refr_now(None)
+    cells_us = time.ticks_diff(time.ticks_us(), t)
+
+    print('draw_cell x%d: set_px %d us (%d us/cell), tile blit %d us (%d us/cell)' % (
+        n, before, before // n, after, after // n))
+    print('init_game: %d us' % init_us)
+    print('step refresh: canvas.invalidate %d us, two cells %d us' % (full_us, cells_us))
 
 # ── Main loop ──
+import runloop
+
+if BENCHMARK:
+    benchmark()
+
 init_game()
 lv.task_handler()
 
-last_step = time.ticks_ms()
-btn1_prev = 0
-btn2_prev = 0
 over_shown = False
 
-time_passed = 1000
-while True:
-    start_time = time.ticks_ms()
-    b1 = btn_left.value()
-    b2 = btn_right.value()
-
-    if not game_over:
-        if b1 == 1 and btn1_prev == 0:
-            direction = (direction - 1) % 4
-        if b2 == 1 and btn2_prev == 0:
-            direction = (direction + 1) % 4
-
-        speed = max(80, 200 - score * 5)
-        now = time.ticks_ms()
-        if time.ticks_diff(now, last_step) >= speed:
-            print('Stepping, score:', score, 'speed:', speed)
-            step()
-            last_step = now
+def period_ms():
+    return max(80, 200 - game.score * 5)
+
+def tick():
+    # one fixed timestep, the loop keeps the deadlines, see runloop.FixedStep
+    global over_shown
+
+    if not game.over:
+        step(player.turn() if player is not None else next_turn())
+        loop.clock.set_period(period_ms())
     else:
         if not over_shown:
             print('Game over, showing message')
             show_game_over()
+            print('steps:', loop.clock.stats())
+            clear_turns()
             over_shown = True
-        if (b1 == 1 and btn1_prev == 0) or (b2 == 1 and btn2_prev == 0):
-            print('Restarting game')
-            init_game()
-            over_shown = False
-
-    btn1_prev = b1
-    btn2_prev = b2
-
-    time.sleep_ms(20)
-    lv.tick_inc(time_passed)
-    lv.task_handler()
-    end_time = time.ticks_ms()
-    time_passed = time.ticks_diff(end_time, start_time)
+        else:
+            turn = player.turn() if player is not None else next_turn()
+            if turn:
+                # stepping a finished game starts the next one
+                print('Restarting game')
+                step(turn)
+                loop.clock.set_period(period_ms())
+                clear_turns()
+                over_shown = False
 
+loop = runloop.RunLoop()
+loop.run_fixed(tick, period_ms=period_ms())
@@ -0,0 +1,311 @@
+"""stripimage, stream images larger than free heap to the panel in strips
+
+A 128x128 RGB565 bitmap is 32 KB, too much next to LVGL's draw buffers on
+the C6. StripRenderer decodes a few lines at a time into one reused DMA
+buffer and sends each strip straight to the display bus, so peak RAM is
+one strip, not the whole image.
+
+    import stripimage
+    strips = stripimage.StripRenderer(display, lines=8)
+    strips.draw(stripimage.RawSource('q_128x128.raw', 128, 128))
+    strips.draw(stripimage.PNGSource('colorful.png'), x=24, y=24)
+
+Pixels are native little endian RGB565 like LVGL's, the bus swaps them
+on the way out (rgb565_byte_swap). RawSource reads what
+`tools/img2lvgl.py --raw` writes with readinto, it is by far the fastest. PNGSource
+decodes 8 bit RGB/RGBA non-interlaced PNGs row by row (inflate stream +
+unfilter, two rows of state) and can decimate to a smaller size, which is
+fine for icons but slow for big photos; convert those on the PC.
+
+The strips bypass LVGL. draw() waits for a flush LVGL may still have in
+flight (lcd.get_bus_lock) and keeps the bus marked busy while it
+streams. Draw after lv.task_handler() has returned, onto a screen area
+that LVGL will not redraw (or redraw it yourself afterwards).
+"""
+
+import struct
+import lcd
+import lcd_bus
+
+try:
+    import deflate
+except ImportError:
+    deflate = None
+    import zlib
+
+try:
+    from io import IOBase
+except ImportError:
+    IOBase = object
+
+
+class RawSource:
+
+    def __init__(self, path, width, height):
+        """__init__, path to headerless little endian RGB565 pixels"""
+
+        self.path = path
+        self.width = width
+        self.height = height
+        self.f = None
+
+    def open(self):
+        self.f = open(self.path, 'rb')
+
+    def read_lines(self, buf, lines):
+        """read_lines, fill buf with up to `lines` rows, return rows read"""
+
+        n = self.f.readinto(memoryview(buf)[:lines * self.width * 2])
+        return n // (self.width * 2)
+
+    def close(self):
+        self.f.close()
+        self.f = None
+
+
+class _IDATStream(IOBase):
+    """concatenated IDAT payloads of a PNG as one stream"""
+
+    def __init__(self, f):
+        self.f = f
+        self.left = 0
+        self.done = False
+
+    def _next_chunk(self):
+        while True:
+            self.f.read(4)  # crc of the previous chunk (or nothing at start)
+            head = self.f.read(8)
+            if len(head) < 8:
+                self.done = True
+                return
+            length, kind = struct.unpack('>I4s', head)
+            if kind == b'IDAT':
+                self.left = length
+                return
+            if kind == b'IEND':
+                self.done = True
+                return
+            self.f.seek(length, 1)
+
+    def readinto(self, buf):
+        while self.left == 0:
+            if self.done:
+                return 0
+            self._next_chunk()
+        n = min(len(buf), self.left)
+        n = self.f.readinto(memoryview(buf)[:n])
+        self.left -= n
+        return n
+
+    def read(self, n):
+        buf = bytearray(n)
+        return bytes(buf[:self.readinto(buf)])
+
+
+class PNGSource:
+
+    def __init__(self, path, width=0, height=0):
+        """__init__, width/height decimate the image (nearest neighbour)"""
+
+        self.path = path
+        with open(path, 'rb') as f:
+            head = f.read(33)
+        if head[:8] != b'\x89PNG\r\n\x1a\n' or head[12:16] != b'IHDR':
+            raise ValueError('not a PNG: %s' % path)
+        w, h, depth, ctype, _, _, interlace = struct.unpack('>IIBBBBB', head[16:29])
+        if depth != 8 or ctype not in (2, 6) or interlace:
+            raise ValueError('only 8 bit RGB/RGBA non-interlaced PNG')
+        self.src_width = w
+        self.src_height = h
+        self.bpp = 4 if ctype == 6 else 3
+        self.width = width or w
+        self.height = height or h
+        self.background = 0x000000
+
+    def open(self):
+        self.f = open(self.path, 'rb')
+        self.f.seek(33 - 4)  # the IDAT reader starts by skipping a crc
+        idat = _IDATStream(self.f)
+        if deflate is not None:
+            self.z = deflate.DeflateIO(idat, deflate.ZLIB)
+        else:
+            self.z = _ZlibReader(idat)
+        stride = self.src_width * self.bpp
+        self.row = bytearray(stride + 1)
+        self.prev = bytearray(stride + 1)
+        self.src_y = -1
+        self.y = 0
+
+    def _next_row(self):
+        # swap row buffers and unfilter the next scanline in place
+        self.row, self.prev = self.prev, self.row
+        row = self.row
+        mv = memoryview(row)
+        got = 0
+        while got < len(row):
+            n = self.z.readinto(mv[got:])
+            if not n:
+                raise ValueError('truncated PNG')
+            got += n
+        _unfilter(row, self.prev, self.bpp)
+        self.src_y += 1
+
+    def read_lines(self, buf, lines):
+        """read_lines, decode up to `lines` target rows into buf"""
+
+        bpp = self.bpp
+        sw = self.src_width
+        w = self.width
+        bg_r = (self.background >> 16) & 0xFF
+        bg_g = (self.background >> 8) & 0xFF
+        bg_b = self.background & 0xFF
+        done = 0
+        o = 0
+        while done < lines and self.y < self.height:
+            want = self.y * self.src_height // self.height
+            while self.src_y < want:
+                self._next_row()
+            row = self.row
+            for x in range(w):
+                i = 1 + (x * sw // w) * bpp
+                r = row[i]
+                g = row[i + 1]
+                b = row[i + 2]
+                if bpp == 4:
+                    a = row[i + 3]
+                    if a != 255:
+                        r = (r * a + bg_r * (255 - a)) // 255
+                        g = (g * a + bg_g * (255 - a)) // 255
+                        b = (b * a + bg_b * (255 - a)) // 255
+                c = ((r & 0xF8) << 8) | ((g & 0xFC) << 3) | (b >> 3)
+                buf[o] = c & 0xFF
+                buf[o + 1] = c >> 8
+                o += 2
+            self.y += 1
+            done += 1
+        return done
+
+    def close(self):
+        self.f.close()
+        self.f = None
+
+
+class _ZlibReader:
+    """CPython fallback for deflate.DeflateIO"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.z = zlib.decompressobj()
+        self.pending = b''
+
+    def readinto(self, buf):
+        while not self.pending:
+            data = self.stream.read(1024)
+            if not data:
+                return 0
+            self.pending = self.z.decompress(data)
+        n = min(len(buf), len(self.pending))
+        buf[:n] = self.pending[:n]
+        self.pending = self.pending[n:]
+        return n
+
+
+def _unfilter(row, prev, bpp):
+    """_unfilter, undo the PNG filter of row (row[0] is the filter type)"""
+
+    ftype = row[0]
+    n = len(row)
+    if ftype == 1:  # Sub
+        for i in range(1 + bpp, n):
+            row[i] = (row[i] + row[i - bpp]) & 0xFF
+    elif ftype == 2:  # Up
+        for i in range(1, n):
+            row[i] = (row[i] + prev[i]) & 0xFF
+    elif ftype == 3:  # Average
+        for i in range(1, n):
+            left = row[i - bpp] if i > bpp else 0
+            row[i] = (row[i] + ((left + prev[i]) >> 1)) & 0xFF
+    elif ftype == 4:  # Paeth
+        for i in range(1, n):
+            if i > bpp:
+                a = row[i - bpp]
+                c = prev[i - bpp]
+            else:
+                a = 0
+                c = 0
+            b = prev[i]
+            p = a + b - c
+            pa = abs(p - a)
+            pb = abs(p - b)
+            pc = abs(p - c)
+            if pa <= pb and pa <= pc:
+                pred = a
+            elif pb <= pc:
+                pred = b
+            else:
+                pred = c
+            row[i] = (row[i] + pred) & 0xFF
+
+
+class StripRenderer:
+
+    def __init__(self, display, lines=8, max_width=0):
+        """__init__, one DMA buffer of `lines` rows of max_width pixels
+        (defaults to the display width)"""
+
+        self.display = display
+        self.lines = lines
+        width = max_width or display._disp_drv.get_horizontal_resolution()
+        self.buf = display._data_bus.allocate_framebuffer(
+            width * lines * 2, lcd_bus.MEMORY_INTERNAL | lcd_bus.MEMORY_DMA)
+        self.busy = False
+        self.strips = 0
+        # tells when an LVGL flush is still on the bus
+        self.lock = lcd.get_bus_lock(display)
+
+    def _tx_done(self, *args):
+        self.busy = False
+
+    def draw(self, source, x=0, y=0):
+        """draw, stream source to the panel with its top left at x, y"""
+
+        display = self.display
+        bus = display._data_bus
+        w = source.width
+        if w * 2 * self.lines > len(self.buf):
+            raise ValueError('image wider than the strip buffer')
+
+        # the last partial flush of lv.task_handler() may still be in
+        # DMA, its transfer done must reach LVGL before we take the bus
+        if not self.lock.acquire():
+            raise OSError('display flush did not finish')
+        self.lock.lcd_busy = True
+
+        # the bus reports the end of each strip to us while we stream
+        bus.register_callback(self._tx_done)
+        try:
+            source.open()
+            try:
+                row = 0
+                while row < source.height:
+                    while self.busy:
+                        pass
+                    n = source.read_lines(self.buf, self.lines)
+                    if n == 0:
+                        break
+                    x1 = x + display._offset_x
+                    y1 = y + row + display._offset_y
+                    cmd = display._set_memory_location(x1, y1, x1 + w - 1, y1 + n - 1)
+                    self.busy = True
+                    bus.tx_color(cmd, memoryview(self.buf)[:w * n * 2], x1, y1,
+                                 x1 + w - 1, y1 + n - 1, display._rotation, True)
+                    self.strips += 1
+                    row += n
+                while self.busy:
+                    pass
+            finally:
+                source.close()
+        finally:
+            bus.register_callback(display._flush_ready_cb)
+            self.lock.lcd_busy = False
+        return
@@ -0,0 +1,228 @@
+"""tilemap, tile and sprite layer on an lv.canvas with one invalidate per frame
+
+A TileMap owns a canvas of cols x rows tiles, an atlas of RGB565 tiles
+and a map of tile indexes. Changing a map entry copies the tile into the
+canvas buffer (fastpath.blit) and grows the frame's dirty rectangle;
+flush() then invalidates that union once, so LVGL re-renders and sends
+only the part of the canvas that changed.
+
+    import tilemap
+    atlas = tilemap.Atlas(8, 8)
+    GRASS = atlas.add_solid(0x9BBC0F)
+    WALL = atlas.add(wall_pixels)           # 8 * 8 * 2 bytes, row major
+    tiles = tilemap.TileMap(scrn, 16, 14, atlas, x=0, y=16)
+    tiles.fill(GRASS)
+    tiles.set(3, 4, WALL)
+    ghost = tiles.sprite(ghost_pixels, 8, 8)
+    ghost.move(20, 30)
+    tiles.flush()                           # once per frame
+
+Sprites are opaque rectangles drawn over the tiles. Moving one restores
+the tiles under its old position and redraws the sprites that overlap
+the dirty area. Pixels are canvas RGB565, native little endian.
+"""
+
+import lvgl as lv
+from fastpath import blit
+
+
+def rgb565(rgb):
+    """rgb565, 0xRRGGBB as the two canvas bytes (little endian)"""
+
+    c = ((rgb >> 8) & 0xF800) | ((rgb >> 5) & 0x07E0) | ((rgb & 0xFF) >> 3)
+    return bytes([c & 0xFF, c >> 8])
+
+
+class Atlas:
+
+    def __init__(self, tile_w, tile_h):
+        """__init__, tiles of tile_w x tile_h pixels in one buffer"""
+
+        self.tile_w = tile_w
+        self.tile_h = tile_h
+        self.tile_bytes = tile_w * tile_h * 2
+        self.data = bytearray()
+        self.count = 0
+        return
+
+    def add(self, pixels):
+        """add, append one tile of RGB565 pixels, returns its index"""
+
+        if len(pixels) != self.tile_bytes:
+            raise ValueError('tile must be %d bytes' % self.tile_bytes)
+        self.data.extend(pixels)
+        self.count += 1
+        return self.count - 1
+
+    def add_solid(self, rgb):
+        """add_solid, append a single colour tile, returns its index"""
+
+        return self.add(rgb565(rgb) * (self.tile_w * self.tile_h))
+
+
+class Sprite:
+
+    def __init__(self, tilemap, pixels, w, h):
+        self.tilemap = tilemap
+        self.pixels = pixels
+        self.w = w
+        self.h = h
+        self.x = 0
+        self.y = 0
+        self.visible = False
+        return
+
+    def move(self, x, y):
+        """move, put the top left corner at canvas pixel x, y"""
+
+        tm = self.tilemap
+        if self.visible:
+            if x == self.x and y == self.y:
+                return
+            tm._restore(self.x, self.y, self.w, self.h)
+        self.x = x
+        self.y = y
+        self.visible = True
+        tm._mark(x, y, x + self.w - 1, y + self.h - 1)
+        return
+
+    def hide(self):
+        """hide, take the sprite off the map"""
+
+        if self.visible:
+            self.visible = False
+            self.tilemap._restore(self.x, self.y, self.w, self.h)
+        return
+
+
+class TileMap:
+
+    def __init__(self, parent, cols, rows, atlas, x=0, y=0):
+        """__init__, a canvas of cols x rows atlas tiles at x, y in parent"""
+
+        self.cols = cols
+        self.rows = rows
+        self.atlas = atlas
+        self.tw = atlas.tile_w
+        self.th = atlas.tile_h
+        self.width = cols * self.tw
+        self.height = rows * self.th
+        self.stride = self.width * 2
+        self.map = bytearray(cols * rows)
+        self.buf = bytearray(self.width * self.height * 2)
+        self.canvas = lv.canvas(parent)
+        self.canvas.set_buffer(self.buf, self.width, self.height, lv.COLOR_FORMAT.RGB565)
+        self.canvas.set_pos(x, y)
+        self.sprites = []
+        # dirty union in canvas pixels, empty when x1 > x2
+        self._coords = lv.area_t()
+        self._area = lv.area_t()
+        self._clean()
+        self.frames = 0
+        self.invalidated_px = 0
+        return
+
+    def _clean(self):
+        self.dx1 = self.width
+        self.dy1 = self.height
+        self.dx2 = -1
+        self.dy2 = -1
+
+    def _mark(self, x1, y1, x2, y2):
+        if x1 < self.dx1:
+            self.dx1 = x1
+        if y1 < self.dy1:
+            self.dy1 = y1
+        if x2 > self.dx2:
+            self.dx2 = x2
+        if y2 > self.dy2:
+            self.dy2 = y2
+
+    def _draw_tile(self, col, row):
+        tw = self.tw
+        th = self.th
+        atlas = self.atlas
+        blit(self.buf, row * th * self.stride + col * tw * 2, self.stride,
+             atlas.data, self.map[row * self.cols + col] * atlas.tile_bytes, tw * 2, tw * 2, th)
+
+    def _restore(self, x, y, w, h):
+        # redraw the tiles under a pixel rectangle
+        c1 = max(0, x // self.tw)
+        r1 = max(0, y // self.th)
+        c2 = min(self.cols - 1, (x + w - 1) // self.tw)
+        r2 = min(self.rows - 1, (y + h - 1) // self.th)
+        for row in range(r1, r2 + 1):
+            for col in range(c1, c2 + 1):
+                self._draw_tile(col, row)
+        self._mark(c1 * self.tw, r1 * self.th, (c2 + 1) * self.tw - 1, (r2 + 1) * self.th - 1)
+
+    def get(self, col, row):
+        """get, tile index at col, row"""
+
+        return self.map[row * self.cols + col]
+
+    def set(self, col, row, index):
+        """set, put tile `index` at col, row (no-op when unchanged)"""
+
+        i = row * self.cols + col
+        if self.map[i] == index:
+            return
+        self.map[i] = index
+        self._draw_tile(col, row)
+        x = col * self.tw
+        y = row * self.th
+        self._mark(x, y, x + self.tw - 1, y + self.th - 1)
+        return
+
+    def fill(self, index):
+        """fill, every tile to `index`"""
+
+        for i in range(len(self.map)):
+            self.map[i] = index
+        for row in range(self.rows):
+            for col in range(self.cols):
+                self._draw_tile(col, row)
+        self._mark(0, 0, self.width - 1, self.height - 1)
+        return
+
+    def sprite(self, pixels, w, h):
+        """sprite, new hidden sprite of w x h RGB565 pixels"""
+
+        s = Sprite(self, pixels, w, h)
+        self.sprites.append(s)
+        return s
+
+    def _draw_sprite(self, s):
+        # clip to the canvas
+        x1 = max(0, s.x)
+        y1 = max(0, s.y)
+        x2 = min(self.width, s.x + s.w)
+        y2 = min(self.height, s.y + s.h)
+        if x1 >= x2 or y1 >= y2:
+            return
+        blit(self.buf, y1 * self.stride + x1 * 2, self.stride,
+             s.pixels, ((y1 - s.y) * s.w + (x1 - s.x)) * 2, s.w * 2, (x2 - x1) * 2, y2 - y1)
+
+    def flush(self):
+        """flush, redraw sprites over the dirty area and invalidate it,
+        once per frame; returns False when nothing changed"""
+
+        if self.dx1 > self.dx2:
+            return False
+        for s in self.sprites:
+            if (s.visible and s.x <= self.dx2 and s.x + s.w > self.dx1
+                    and s.y <= self.dy2 and s.y + s.h > self.dy1):
+                self._draw_sprite(s)
+
+        # invalidate_area takes screen coordinates
+        self.canvas.get_coords(self._coords)
+        a = self._area
+        a.x1 = self._coords.x1 + max(0, self.dx1)
+        a.y1 = self._coords.y1 + max(0, self.dy1)
+        a.x2 = self._coords.x1 + min(self.width - 1, self.dx2)
+        a.y2 = self._coords.y1 + min(self.height - 1, self.dy2)
+        self.canvas.invalidate_area(a)
+        self.frames += 1
+        self.invalidated_px += (a.x2 - a.x1 + 1) * (a.y2 - a.y1 + 1)
+        self._clean()
+        return True
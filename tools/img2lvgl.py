@@ -0,0 +1,205 @@
+"""img2lvgl, convert PNGs to pre-decoded RGB565 images on the host
+
+Runs on the PC (needs Pillow), so the board never decodes PNG at boot.
+
+    python3 tools/img2lvgl.py basic/colorful.png --size 128x128 --bin
+    python3 tools/img2lvgl.py basic/semiblock.png --height 20 --py
+    python3 tools/img2lvgl.py basic/q.png --size 128x128 --raw
+
+Outputs, next to the input unless -o is given:
+    --bin  LVGL v9 binary image (.bin), load it with img.set_src("S:name.bin")
+    --py   Python module with the pixels as a bytes literal and dsc()
+           returning a ready lv.image_dsc_t; freeze it into the firmware
+           and the pixels stay in flash
+    --raw  headerless RGB565 pixels for stripimage.py
+
+LVGL blends in native little endian RGB565 and the st7735 driver's bus
+swaps the bytes of everything it sends (rgb565_byte_swap), so all three
+outputs keep native order, --raw included. The panel's MADCTL BGR bit already takes care of
+BYTE_ORDER_BGR; --bgr swaps red and blue for panels wired without it.
+
+Images with transparent pixels become RGB565A8 (--bin/--py) unless
+--bg flattens them onto a background colour; --raw is always flattened.
+"""
+
+import argparse
+import os
+import struct
+import sys
+
+from PIL import Image
+
+# lv_color_format_t
+CF_RGB565 = 0x12
+CF_RGB565A8 = 0x14
+# lv_image_header_t magic for LVGL v9
+IMAGE_HEADER_MAGIC = 0x19
+
+
+def parse_size(text):
+    w, h = text.lower().split('x')
+    return int(w), int(h)
+
+
+def load(path, size=None, height=None):
+    """load, open and resize to the target resolution"""
+
+    img = Image.open(path).convert('RGBA')
+    if size is not None:
+        img = img.resize(size, Image.LANCZOS)
+    elif height is not None:
+        w, h = img.size
+        img = img.resize((max(1, int(w * height / h)), height), Image.LANCZOS)
+    return img
+
+
+def flatten(img, bg):
+    """flatten, composite onto a solid background colour"""
+
+    back = Image.new('RGBA', img.size, ((bg >> 16) & 0xFF, (bg >> 8) & 0xFF, bg & 0xFF, 255))
+    return Image.alpha_composite(back, img)
+
+
+def has_alpha(img):
+    return img.getchannel('A').getextrema()[0] < 255
+
+
+def rgb565(img, bgr=False):
+    """rgb565, pixel data as native little endian RGB565"""
+
+    rgba = img.tobytes()
+    out = bytearray(len(rgba) // 2)
+    for i in range(0, len(rgba), 4):
+        r, g, b = rgba[i], rgba[i + 1], rgba[i + 2]
+        if bgr:
+            r, b = b, r
+        struct.pack_into('<H', out, i // 2, ((r & 0xF8) << 8) | ((g & 0xFC) << 3) | (b >> 3))
+    return out
+
+
+def alpha8(img):
+    return img.getchannel('A').tobytes()
+
+
+def lvgl_header(cf, w, h, stride):
+    """lvgl_header, 12 byte lv_image_header_t"""
+
+    return struct.pack('<BBHHHHH', IMAGE_HEADER_MAGIC, cf, 0, w, h, stride, 0)
+
+
+def convert(img, bg=None, bgr=False):
+    """convert, (cf, data) for an LVGL image"""
+
+    if bg is not None:
+        img = flatten(img, bg)
+    data = rgb565(img, bgr=bgr)
+    if has_alpha(img):
+        return CF_RGB565A8, data + alpha8(img)
+    return CF_RGB565, data
+
+
+def write_bin(path, img, bg=None, bgr=False):
+    cf, data = convert(img, bg, bgr)
+    w, h = img.size
+    with open(path, 'wb') as f:
+        f.write(lvgl_header(cf, w, h, w * 2))
+        f.write(data)
+
+
+def write_raw(path, img, bg=0x000000, bgr=False):
+    with open(path, 'wb') as f:
+        f.write(rgb565(flatten(img, bg), bgr=bgr))
+
+
+PY_TEMPLATE = '''"""{name}, {w}x{h} {cfname} image generated by tools/img2lvgl.py from {src}"""
+
+import lvgl as lv
+
+WIDTH = {w}
+HEIGHT = {h}
+CF = {cf}
+
+DATA = {data}
+
+_dsc = None
+
+
+def dsc():
+    """dsc, the lv.image_dsc_t for img.set_src(), built once"""
+
+    global _dsc
+    if _dsc is None:
+        # 0x19 is the LVGL v9 lv_image_header_t magic
+        _dsc = lv.image_dsc_t({{
+            'header': {{'magic': 0x19, 'cf': CF, 'w': WIDTH, 'h': HEIGHT, 'stride': WIDTH * 2}},
+            'data_size': len(DATA),
+            'data': DATA,
+        }})
+    return _dsc
+'''
+
+
+def bytes_literal(data, width=76):
+    """bytes_literal, wrapped bytes literal source"""
+
+    lines = []
+    line = ''
+    for b in data:
+        part = '\\x%02x' % b
+        if len(line) + len(part) > width:
+            lines.append("    b'" + line + "'")
+            line = ''
+        line += part
+    if line:
+        lines.append("    b'" + line + "'")
+    return '(\n' + '\n'.join(lines) + '\n)'
+
+
+def write_py(path, img, src, bg=None, bgr=False):
+    cf, data = convert(img, bg, bgr)
+    w, h = img.size
+    name = os.path.splitext(os.path.basename(path))[0]
+    with open(path, 'w') as f:
+        f.write(PY_TEMPLATE.format(
+            name=name, w=w, h=h, src=os.path.basename(src),
+            cf=hex(cf), cfname='RGB565A8' if cf == CF_RGB565A8 else 'RGB565',
+            data=bytes_literal(data)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('inputs', nargs='+')
+    parser.add_argument('--size', type=parse_size, help='WxH target resolution')
+    parser.add_argument('--height', type=int, help='target height, keeps aspect ratio')
+    parser.add_argument('--bin', action='store_true', help='write LVGL .bin image')
+    parser.add_argument('--py', action='store_true', help='write Python module with image descriptor')
+    parser.add_argument('--raw', action='store_true', help='write headerless RGB565')
+    parser.add_argument('--bg', type=lambda s: int(s, 16), help='flatten alpha onto this hex colour')
+    parser.add_argument('--bgr', action='store_true', help='swap red and blue')
+    parser.add_argument('-o', '--outdir', help='output directory')
+    args = parser.parse_args(argv)
+
+    if not (args.bin or args.py or args.raw):
+        args.bin = True
+
+    for src in args.inputs:
+        img = load(src, args.size, args.height)
+        base = os.path.splitext(os.path.basename(src))[0]
+        if args.size or args.height:
+            base += '_%dx%d' % img.size
+        base = base.replace('-', '_')
+        outdir = args.outdir or os.path.dirname(src) or '.'
+
+        if args.bin:
+            write_bin(os.path.join(outdir, base + '.bin'), img, args.bg, args.bgr)
+        if args.py:
+            write_py(os.path.join(outdir, base + '.py'), img, src, args.bg, args.bgr)
+        if args.raw:
+            write_raw(os.path.join(outdir, base + '.raw'), img,
+                      args.bg if args.bg is not None else 0x000000, args.bgr)
+        print(src, '->', base, img.size)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,171 @@
+"""vscroll, hardware vertical scrolling on the ST7735 for strip charts and tickers
+
+Moving something by a few pixels through LVGL re-renders and re-sends the
+whole old and new area every frame. The ST7735 can instead scroll a band
+of its frame memory by itself: VSCRDEF (0x33) defines the band, VSCSAD
+(0x37) sets which memory row is shown first. VScroll moves the start row
+and sends only the newly exposed lines, so a 128 pixel wide strip chart
+costs 256 bytes per line instead of a full redraw.
+
+    import vscroll
+    scroll = vscroll.VScroll(display, top=16, height=112)
+    row = bytearray(128 * 2)
+    ...
+    scroll.push(row)        # one new line at the bottom, the rest moves up
+    scroll.push(rows, 4)    # four lines at once
+
+Lines are native little endian RGB565 like LVGL's and the canvas code
+(the bus byte swaps them on the way out), display width pixels each, and
+are sent with the bus directly, bypassing LVGL; push() first waits for a
+flush LVGL may still have in flight (lcd.get_bus_lock). Keep LVGL
+objects off the band (or on a screen LVGL is not redrawing), otherwise
+LVGL draws at unscrolled positions.
+
+Only rotation 0 and 180 are supported, the panel scrolls along its native
+rows. A sideways marquee needs the panel mounted on its side with the
+text drawn line by line.
+"""
+
+import lcd
+import lvgl as lv
+from micropython import const
+
+_NORON = const(0x13)
+_VSCRDEF = const(0x33)
+_VSCSAD = const(0x37)
+
+# ST7735 frame memory is 132 x 162, the glass shows a window of it
+MEMORY_HEIGHT = 162
+
+
+class VScroll:
+
+    def __init__(self, display, top=0, height=0, memory_height=MEMORY_HEIGHT):
+        """__init__, scroll the band of `height` rows starting at logical row
+        `top`, by default the whole screen"""
+
+        rotation = display._rotation
+        if rotation not in (lv.DISPLAY_ROTATION._0, lv.DISPLAY_ROTATION._180):
+            raise ValueError('vertical scroll needs rotation 0 or 180')
+
+        self.display = display
+        # tells when an LVGL flush is still on the bus
+        self.lock = lcd.get_bus_lock(display)
+        self.width = display._disp_drv.get_horizontal_resolution()
+        self.top = top
+        self.height = height or display._disp_drv.get_vertical_resolution() - top
+        self.memory_height = memory_height
+
+        # with rotation 180 (MADCTL MY) logical rows run backwards through
+        # frame memory, the scan still goes up in memory
+        self.flipped = rotation == lv.DISPLAY_ROTATION._180
+        if self.flipped:
+            self.first = memory_height - (display._offset_y + top + self.height)
+        else:
+            self.first = display._offset_y + top
+
+        # ring index of the band row shown first on the glass
+        self.pos = 0
+        self.pushed = 0
+        self.bytes = 0
+        self.busy = False
+        self._param = bytearray(6)
+        self.define()
+        return
+
+    def define(self):
+        """define, send the band to the panel (VSCRDEF) and reset the start"""
+
+        bottom = self.memory_height - self.first - self.height
+        p = self._param
+        p[0] = self.first >> 8
+        p[1] = self.first & 0xFF
+        p[2] = self.height >> 8
+        p[3] = self.height & 0xFF
+        p[4] = bottom >> 8
+        p[5] = bottom & 0xFF
+        self.display._data_bus.tx_param(_VSCRDEF, p)
+        self.pos = 0
+        self._start()
+        return
+
+    def _start(self):
+        ssa = self.first + self.pos
+        p = self._param
+        p[0] = ssa >> 8
+        p[1] = ssa & 0xFF
+        self.display._data_bus.tx_param(_VSCSAD, memoryview(p)[:2])
+
+    def _tx_done(self, *args):
+        self.busy = False
+
+    def _row_y(self, index):
+        # logical row of band ring index
+        if self.flipped:
+            return self.top + self.height - 1 - index
+        return self.top + index
+
+    def push(self, buf, n=1):
+        """push, scroll the band by n lines and draw buf's n rows in the
+        lines that come into view at the bottom (top row first)"""
+
+        if n > self.height:
+            raise ValueError('more lines than the scroll band')
+        display = self.display
+        bus = display._data_bus
+        h = self.height
+        row = self.width * 2
+
+        # unflipped the rows leaving the top are reused at the bottom and
+        # the start moves forward; flipped the start moves backward
+        if self.flipped:
+            self.pos = (self.pos - n) % h
+            first = self.pos + n - 1
+            step = -1
+        else:
+            first = self.pos
+            self.pos = (self.pos + n) % h
+            step = 1
+
+        # an LVGL flush may still be in DMA, its transfer done must reach
+        # LVGL before we take the bus
+        if not self.lock.acquire():
+            raise OSError('display flush did not finish')
+        self.lock.lcd_busy = True
+
+        bus.register_callback(self._tx_done)
+        try:
+            k = 0
+            while k < n:
+                y1 = self._row_y((first + step * k) % h)
+                # send as many rows as are consecutive in frame memory
+                run = 1
+                while k + run < n and self._row_y((first + step * (k + run)) % h) == y1 + run:
+                    run += 1
+                x1 = display._offset_x
+                y = y1 + display._offset_y
+                cmd = display._set_memory_location(x1, y, x1 + self.width - 1, y + run - 1)
+                while self.busy:
+                    pass
+                self.busy = True
+                bus.tx_color(cmd, memoryview(buf)[k * row:(k + run) * row],
+                             x1, y, x1 + self.width - 1, y + run - 1, display._rotation, True)
+                k += run
+            while self.busy:
+                pass
+            self._start()
+        finally:
+            bus.register_callback(display._flush_ready_cb)
+            self.lock.lcd_busy = False
+
+        self.pushed += n
+        self.bytes += n * row
+        return
+
+    def release(self):
+        """release, leave scroll mode (NORON) with the band unscrolled"""
+
+        self.pos = 0
+        self._start()
+        self.display._data_bus.tx_param(_NORON)
+        return